@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import List, Dict
 import json
 
 class Settings(BaseSettings):
@@ -7,10 +7,90 @@ class Settings(BaseSettings):
     GPTZERO_API_KEY: str = ""
     ANTHROPIC_API_KEY: str = ""
     CORS_ORIGINS: str = '["http://localhost:3000"]'
+
+    # Detections run at once per /detect/batch or /detect/tweets request
+    DETECT_BATCH_CONCURRENCY: int = 8
+
+    # ContentScan write-behind buffer
+    SCAN_BUFFER_SIZE: int = 10000  # queued rows before submitters wait
+    SCAN_FLUSH_ROWS: int = 500
+    SCAN_FLUSH_INTERVAL_MS: int = 250
+    SCAN_FLUSH_RETRIES: int = 5  # failed flushes retried with backoff before rows are dropped
+
+    # Verification view counts are flushed to the database this often
+    VIEW_COUNT_FLUSH_INTERVAL_MS: int = 2000
+
+    # Bloom filter of verified hashes answering /check misses in memory
+    VERIFICATION_FILTER_CAPACITY: int = 1000000  # rebuilt at twice the size once exceeded
+    VERIFICATION_FILTER_FP_RATE: float = 0.001
+    VERIFICATION_FILTER_SYNC_MS: int = 5000  # picks up other workers' inserts
+
+    # Verified-hash snapshots: a new version every interval, lagging by settle
+    SNAPSHOT_INTERVAL_S: int = 60
+    SNAPSHOT_SETTLE_S: int = 30
+
+    # Stats responses are recomputed at most once per TTL (seconds, per endpoint)
+    # and served stale for up to STATS_CACHE_STALE_S more while refreshing
+    STATS_CACHE_TTLS: str = '{"stats": 10, "realtime": 5, "admin_global": 30, "verifications": 30, "trending": 30}'
+    STATS_CACHE_STALE_S: int = 60
+
+    # Live stats stream: delta events kept for resuming clients, idle heartbeat
+    LIVE_STATS_HISTORY: int = 1000
+    LIVE_STATS_HEARTBEAT_S: float = 15.0
+
+    # HyperLogLog sketches of scanned content: 2^precision registers
+    # (14 -> 16 KB, ~0.81% standard error), written every flush interval
+    CONTENT_SKETCH_PRECISION: int = 14
+    CONTENT_SKETCH_FLUSH_S: int = 30
+
+    # Top viewed verifications: Space-Saving counters kept all-time and per
+    # slice over a sliding window, checkpointed per process
+    HEAVY_HITTERS_CAPACITY: int = 1000
+    HEAVY_HITTERS_WINDOW_CAPACITY: int = 200
+    HEAVY_HITTERS_WINDOW_S: int = 3600
+    HEAVY_HITTERS_SLICE_S: int = 300
+    HEAVY_HITTERS_CHECKPOINT_S: int = 60
+
+    # Fact-check claims packed into one LLM request
+    FACTCHECK_BATCH_SIZE: int = 5
+    # Overall seconds a fact-check request may wait on the LLM
+    FACTCHECK_TIME_BUDGET: float = 8.0
+
+    # Per-provider outbound limits, merged over governor.DEFAULT_LIMITS, e.g.
+    # '{"anthropic": {"max_limit": 8, "rate": 2.0}}'
+    OUTBOUND_LIMITS: str = '{}'
+
+    # Screen companion: per-session debounce (seconds) and the perceptual-hash
+    # distance (bits out of 64) under which two screenshots count as unchanged
+    COMPANION_MIN_INTERVAL: float = 5.0
+    COMPANION_SCREEN_DISTANCE: int = 5
+    # Screenshots are downscaled to this longest edge and re-encoded before vision calls
+    COMPANION_MAX_IMAGE_EDGE: int = 1280
+    COMPANION_JPEG_QUALITY: int = 80
+
+    # Known-claims knowledge base (built with build_claim_kb.py)
+    CLAIM_KB_PATH: str = ""
+    CLAIM_KB_MIN_SIMILARITY: float = 0.6
+
+    # Fact-check verdict cache
+    CLAIM_CACHE_SIZE: int = 10000
+    CLAIM_CACHE_TTLS: str = '{"TRUE": 604800, "FALSE": 604800, "MISLEADING": 259200, "NEEDS_CONTEXT": 86400, "UNVERIFIABLE": 21600}'
     
     @property
     def cors_origins_list(self) -> List[str]:
         return json.loads(self.CORS_ORIGINS)
+
+    @property
+    def outbound_limits(self) -> Dict[str, Dict]:
+        return json.loads(self.OUTBOUND_LIMITS)
+
+    @property
+    def claim_cache_ttls(self) -> Dict[str, int]:
+        return json.loads(self.CLAIM_CACHE_TTLS)
+
+    @property
+    def stats_cache_ttls(self) -> Dict[str, float]:
+        return json.loads(self.STATS_CACHE_TTLS)
     
     class Config:
         env_file = ".env"
@@ -0,0 +1,175 @@
+"""
+Distinct-content counting with HyperLogLog sketches
+
+Replaces COUNT(DISTINCT content_hash) over content_scans. Every committed
+scan batch is added to in-memory sketches per hour, platform and
+classification; every CONTENT_SKETCH_FLUSH_S they are upserted into
+content_sketches under this process's node id. Each node only rewrites its
+own rows, so no read-merge-write race between workers exists.
+
+Counts merge the relevant rows. Hours more than SETTLED_HOURS old no longer
+change, so their all-time merge is kept in memory and only newer rows are
+read per call. Estimates carry HyperLogLog's error (app.hll, about 0.81%
+standard error at precision 14).
+"""
+import os
+import time
+import socket
+import asyncio
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Optional, Set, Tuple
+from sqlalchemy import select
+from app.config import settings
+from app.database import engine, dialect_insert
+from app.models import ContentSketch, Classification
+from app.hll import HyperLogLog
+from app.rollups import bucket_start
+
+# Nodes stop writing an hour once it has ended and been flushed
+SETTLED_HOURS = 2
+
+SketchKey = Tuple[datetime, str, Classification]
+
+def node_id() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}"[:100]
+
+class ContentSketches:
+    def __init__(self, precision: int = 14, flush_interval: float = 30.0):
+        self.precision = precision
+        self.flush_interval = flush_interval
+        self.node = node_id()
+
+        # This node's sketches for recent hours, and which changed since the last flush
+        self._sketches: Dict[SketchKey, HyperLogLog] = {}
+        self._dirty: Set[SketchKey] = set()
+        self._task: Optional[asyncio.Task] = None
+        self._stopping: Optional[asyncio.Event] = None
+
+        # Read side: merge of every row in settled hours (< _settled_until)
+        self._settled: Optional[HyperLogLog] = None
+        self._settled_until: Optional[datetime] = None
+
+        self.added = 0
+        self.flushes = 0
+        self.errors = 0
+        self.last_flush_at: Optional[float] = None
+
+    @property
+    def error(self) -> float:
+        return HyperLogLog(self.precision).error
+
+    def add(self, scans: Iterable[Dict]):
+        """Count committed ContentScan rows (column dicts)"""
+        grouped: Dict[SketchKey, list] = {}
+        for scan in scans:
+            key = (bucket_start(scan["created_at"], "hour"), scan["source_platform"] or "unknown", scan["classification"])
+            grouped.setdefault(key, []).append(scan["content_hash"])
+
+        for key, hashes in grouped.items():
+            sketch = self._sketches.get(key)
+            if sketch is None:
+                sketch = self._sketches[key] = HyperLogLog(self.precision)
+            sketch.add_many(hashes)
+            self._dirty.add(key)
+            self.added += len(hashes)
+
+    async def start(self):
+        if self._task is None:
+            self._stopping = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            # Let a flush in progress finish: cancelling it would drop its dirty keys
+            self._stopping.set()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.flush()
+
+    async def _run(self):
+        while not self._stopping.is_set():
+            try:
+                await asyncio.wait_for(self._stopping.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                await self.flush()
+
+    async def flush(self):
+        dirty, self._dirty = self._dirty, set()
+        if dirty:
+            now = datetime.utcnow()
+            rows = [
+                dict(node=self.node, bucket=bucket, source_platform=platform, classification=classification,
+                     sketch=self._sketches[(bucket, platform, classification)].to_bytes(), updated_at=now)
+                for bucket, platform, classification in sorted(dirty, key=str)
+            ]
+            table = ContentSketch.__table__
+            stmt = dialect_insert(table).values(rows)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=['node', 'bucket', 'source_platform', 'classification'],
+                set_={'sketch': stmt.excluded.sketch, 'updated_at': stmt.excluded.updated_at}
+            )
+            try:
+                async with engine.begin() as conn:
+                    await conn.execute(stmt)
+            except Exception as e:
+                print(f"Content sketch flush error: {e}")
+                self.errors += 1
+                self._dirty |= dirty
+                return
+            self.flushes += 1
+            self.last_flush_at = time.time()
+
+        # Keep the previous hour for stragglers; a dropped sketch must never be
+        # re-created, or its next flush would overwrite the stored row
+        keep_from = bucket_start(datetime.utcnow(), "hour") - timedelta(hours=1)
+        for key in [key for key in self._sketches if key[0] < keep_from and key not in self._dirty]:
+            del self._sketches[key]
+
+    async def _merge(self, db, query, into: HyperLogLog) -> HyperLogLog:
+        rows = await db.stream_scalars(query.execution_options(yield_per=1000))
+        async for data in rows:
+            into.merge(HyperLogLog.from_bytes(data))
+        return into
+
+    def _merge_local(self, into: HyperLogLog, since: Optional[datetime] = None) -> HyperLogLog:
+        """Fold in this node's sketches, which may not have been flushed yet"""
+        for (bucket, _, _), sketch in self._sketches.items():
+            if since is None or bucket >= since:
+                into.merge(sketch)
+        return into
+
+    async def unique(self, db, since: Optional[datetime] = None) -> int:
+        """Estimated distinct content hashes scanned (since the start of since's hour, or ever)"""
+        if since is not None:
+            since = bucket_start(since, "hour")
+            query = select(ContentSketch.sketch).where(ContentSketch.bucket >= since)
+            return self._merge_local(await self._merge(db, query, HyperLogLog(self.precision)), since).count()
+
+        settled_until = bucket_start(datetime.utcnow(), "hour") - timedelta(hours=SETTLED_HOURS)
+        if self._settled is None or settled_until > self._settled_until:
+            query = select(ContentSketch.sketch).where(ContentSketch.bucket < settled_until)
+            if self._settled is not None:
+                query = query.where(ContentSketch.bucket >= self._settled_until)
+            self._settled = await self._merge(db, query, self._settled or HyperLogLog(self.precision))
+            self._settled_until = settled_until
+
+        query = select(ContentSketch.sketch).where(ContentSketch.bucket >= self._settled_until)
+        return self._merge_local(await self._merge(db, query, self._settled.copy())).count()
+
+    def stats(self) -> Dict:
+        return {
+            'node': self.node,
+            'sketches': len(self._sketches),
+            'dirty': len(self._dirty),
+            'added': self.added,
+            'flushes': self.flushes,
+            'errors': self.errors,
+            'standard_error': round(self.error, 4),
+            'settled_until': self._settled_until.isoformat() if self._settled_until else None,
+            'last_flush_age_s': round(time.time() - self.last_flush_at, 1) if self.last_flush_at else None
+        }
+
+content_sketches = ContentSketches(
+    precision=settings.CONTENT_SKETCH_PRECISION,
+    flush_interval=settings.CONTENT_SKETCH_FLUSH_S
+)
@@ -1,3 +1,5 @@
+import time
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import declarative_base
 from app.config import settings
@@ -6,6 +8,68 @@ engine = create_async_engine(settings.DATABASE_URL, echo=False)
 async_session = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 Base = declarative_base()
 
+class PoolMetrics:
+    """How long connections stay checked out of the pool"""
+
+    # Upper bounds (seconds) of the checkout-time histogram
+    BUCKETS = (0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0, float("inf"))
+
+    def __init__(self):
+        self.checkouts = 0
+        self.checked_out = 0
+        self.max_checked_out = 0
+        self.max_hold = 0.0
+        self.total_hold = 0.0
+        self.histogram = [0] * len(self.BUCKETS)
+
+    def on_checkout(self, dbapi_connection, record, proxy):
+        record.info["checked_out_at"] = time.monotonic()
+        self.checkouts += 1
+        self.checked_out += 1
+        self.max_checked_out = max(self.max_checked_out, self.checked_out)
+
+    def on_checkin(self, dbapi_connection, record):
+        started = record.info.pop("checked_out_at", None)
+        if started is None:
+            return
+        held = time.monotonic() - started
+        self.checked_out -= 1
+        self.total_hold += held
+        self.max_hold = max(self.max_hold, held)
+        for i, bound in enumerate(self.BUCKETS):
+            if held <= bound:
+                self.histogram[i] += 1
+                break
+
+    def stats(self) -> dict:
+        pool = engine.pool
+        returned = self.checkouts - self.checked_out
+        return {
+            "pool_size": pool.size() if hasattr(pool, "size") else None,
+            "overflow": pool.overflow() if hasattr(pool, "overflow") else None,
+            "checked_out": self.checked_out,
+            "max_checked_out": self.max_checked_out,
+            "checkouts": self.checkouts,
+            "avg_hold_ms": round(self.total_hold / returned * 1000, 2) if returned > 0 else 0,
+            "max_hold_ms": round(self.max_hold * 1000, 2),
+            "hold_histogram": {
+                (f"le_{bound}s" if bound != float("inf") else "inf"): count
+                for bound, count in zip(self.BUCKETS, self.histogram)
+            }
+        }
+
+pool_metrics = PoolMetrics()
+event.listen(engine.sync_engine, "checkout", pool_metrics.on_checkout)
+event.listen(engine.sync_engine, "checkin", pool_metrics.on_checkin)
+
+def dialect_insert(table):
+    """INSERT construct for the configured dialect (supports ON CONFLICT)"""
+    if engine.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(table)
+
 async def init_db():
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
@@ -1,5 +1,4 @@
-from .text import TextDetector
+from .text import TextDetector, text_detector
 from .image import ImageDetector
 
-text_detector = TextDetector()
 image_detector = ImageDetector()
@@ -0,0 +1,136 @@
+import json
+import time
+import hashlib
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Tuple
+from sqlalchemy import select
+from app.config import settings
+from app.database import async_session, dialect_insert
+from app.models import ClaimVerdict
+
+def normalize_claim(claim: str) -> str:
+    """Normalize claim text so trivially different phrasings share a key"""
+    claim = claim.lower().replace('’', "'").replace('“', '"').replace('”', '"')
+    claim = ' '.join(claim.split())
+    return claim.strip(' .!?"\'')
+
+def claim_digest(claim: str) -> str:
+    """SHA-256 of the normalized claim"""
+    return hashlib.sha256(normalize_claim(claim).encode()).hexdigest()
+
+class ClaimVerdictCache:
+    """Two-tier verdict cache: in-process LRU in front of the claim_verdicts table"""
+
+    def __init__(self, max_entries: int = 10000, ttls: Optional[Dict[str, int]] = None):
+        self.max_entries = max_entries
+        self.ttls = ttls or {}
+        self.default_ttl = min(self.ttls.values()) if self.ttls else 3600
+
+        # digest -> (expires_at epoch seconds, verdict dict)
+        self._entries: "OrderedDict[str, Tuple[float, Dict]]" = OrderedDict()
+
+        self.memory_hits = 0
+        self.db_hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.errors = 0
+
+    def ttl_for(self, verdict: str) -> int:
+        """Seconds a verdict stays fresh (settled verdicts live longer)"""
+        return self.ttls.get(verdict, self.default_ttl)
+
+    def _remember(self, digest: str, expires_at: float, result: Dict):
+        self._entries[digest] = (expires_at, result)
+        self._entries.move_to_end(digest)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def get(self, claim: str) -> Optional[Dict]:
+        """Return a fresh cached verdict dict, or None on miss"""
+        digest = claim_digest(claim)
+        now = time.time()
+
+        entry = self._entries.get(digest)
+        if entry:
+            expires_at, result = entry
+            if expires_at > now:
+                self._entries.move_to_end(digest)
+                self.memory_hits += 1
+                return result
+            del self._entries[digest]
+
+        try:
+            async with async_session() as session:
+                row = await session.execute(
+                    select(ClaimVerdict).where(
+                        ClaimVerdict.claim_hash == digest,
+                        ClaimVerdict.expires_at > datetime.utcnow()
+                    )
+                )
+                cached = row.scalar_one_or_none()
+        except Exception as e:
+            print(f"Claim cache read error: {e}")
+            self.errors += 1
+            cached = None
+
+        if not cached:
+            self.misses += 1
+            return None
+
+        result = {
+            'verdict': cached.verdict,
+            'confidence': cached.confidence,
+            'explanation': cached.explanation or '',
+            'sources': json.loads(cached.sources) if cached.sources else []
+        }
+        remaining = (cached.expires_at - datetime.utcnow()).total_seconds()
+        self._remember(digest, now + remaining, result)
+        self.db_hits += 1
+        return result
+
+    async def put(self, claim: str, result: Dict):
+        """Store a verdict dict in both tiers"""
+        digest = claim_digest(claim)
+        ttl = self.ttl_for(result['verdict'])
+        self._remember(digest, time.time() + ttl, result)
+
+        now = datetime.utcnow()
+        values = {
+            'claim': claim[:1000],
+            'verdict': result['verdict'],
+            'confidence': result['confidence'],
+            'explanation': result['explanation'],
+            'sources': json.dumps(result['sources']),
+            'created_at': now,
+            'expires_at': now + timedelta(seconds=ttl)
+        }
+        stmt = dialect_insert(ClaimVerdict.__table__).values(claim_hash=digest, **values)
+        stmt = stmt.on_conflict_do_update(index_elements=['claim_hash'], set_=values)
+
+        try:
+            async with async_session() as session:
+                await session.execute(stmt)
+                await session.commit()
+            self.writes += 1
+        except Exception as e:
+            print(f"Claim cache write error: {e}")
+            self.errors += 1
+
+    def stats(self) -> Dict:
+        hits = self.memory_hits + self.db_hits
+        lookups = hits + self.misses
+        return {
+            'entries_in_memory': len(self._entries),
+            'memory_hits': self.memory_hits,
+            'db_hits': self.db_hits,
+            'misses': self.misses,
+            'writes': self.writes,
+            'errors': self.errors,
+            'hit_rate': round(hits / lookups, 4) if lookups > 0 else 0
+        }
+
+claim_cache = ClaimVerdictCache(
+    max_entries=settings.CLAIM_CACHE_SIZE,
+    ttls=settings.claim_cache_ttls
+)
@@ -0,0 +1,235 @@
+"""
+Known-claims knowledge base for offline fact checking
+
+Claims are stored in a compact binary file that is memory-mapped read-only,
+so every worker process shares the same pages. Lookups go through an
+inverted token index to find candidates, then rank them by MinHash
+similarity against the query. Negation is kept out of the tokens as a
+per-claim flag, and only claims with the same flag can match.
+
+File layout (little-endian, every section padded to 8 bytes):
+    header       magic "CLKB", version, entries, permutations, tokens, postings, blob size
+    signatures   uint32[entries][permutations]   MinHash signature per claim
+    verdicts     uint8[entries]                  index into KB_VERDICTS
+    negated      uint8[entries]                  1 if the claim is negated
+    confidences  float32[entries]
+    records      uint64[entries + 1]             offsets into blob
+    tokens       uint32[tokens]                  sorted token hashes
+    token_starts uint32[tokens + 1]              offsets into postings
+    postings     uint32[postings]                claim ids per token
+    blob         utf-8 JSON records {"claim", "explanation", "sources"}
+"""
+import re
+import json
+import mmap
+import zlib
+import struct
+from typing import Dict, Iterable, List, Optional
+import numpy as np
+
+KB_MAGIC = b"CLKB"
+KB_VERSION = 2
+KB_VERDICTS = ["TRUE", "FALSE", "MISLEADING", "UNVERIFIABLE", "NEEDS_CONTEXT"]
+
+_HEADER = struct.Struct("<4sIIIIIQ")
+_TOKEN = re.compile(r"[a-z0-9]+")
+_NEGATION = re.compile(r"\b(?:not|no|never|cannot)\b|n['\u2019]t\b")
+_STOPWORDS = frozenset(
+    "a an and are as at be but by for from has have in is it its of on or that the "
+    "this to was were will with".split()
+)
+
+# MinHash permutations h -> (a * h + b) mod p over 32-bit token hashes
+_PRIME = np.uint64(4294967311)
+
+def _permutations(count: int):
+    rng = np.random.RandomState(count)
+    a = rng.randint(1, 2**32 - 1, size=count, dtype=np.uint64)
+    b = rng.randint(0, 2**32 - 1, size=count, dtype=np.uint64)
+    return a, b
+
+def claim_negated(text: str) -> bool:
+    """Whether the claim contains a negation (not, no, never, n't)"""
+    return _NEGATION.search(text.lower()) is not None
+
+def claim_tokens(text: str) -> np.ndarray:
+    """Unique 32-bit hashes of the claim's content words, negations left out"""
+    words = {w for w in _TOKEN.findall(_NEGATION.sub(" ", text.lower())) if w not in _STOPWORDS}
+    return np.array(sorted(zlib.crc32(w.encode()) for w in words), dtype=np.uint32)
+
+def minhash(tokens: np.ndarray, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """MinHash signature of a token hash set"""
+    if len(tokens) == 0:
+        return np.full(len(a), 0xFFFFFFFF, dtype=np.uint32)
+    hashed = (np.outer(tokens.astype(np.uint64), a) + b) % _PRIME
+    return hashed.min(axis=0).astype(np.uint32)
+
+def _pad(size: int) -> int:
+    return (8 - size % 8) % 8
+
+def build_knowledge_base(records: Iterable[Dict], path: str, permutations: int = 64) -> int:
+    """Write records ({"claim", "verdict", "confidence"?, "explanation"?, "sources"?}) to path"""
+    a, b = _permutations(permutations)
+
+    signatures, verdicts, negated, confidences, offsets = [], [], [], [], [0]
+    blob = bytearray()
+    index: Dict[int, List[int]] = {}
+
+    for record in records:
+        verdict = str(record.get("verdict", "")).upper()
+        if not record.get("claim") or verdict not in KB_VERDICTS:
+            continue
+
+        tokens = claim_tokens(record["claim"])
+        if len(tokens) == 0:
+            continue
+
+        claim_id = len(verdicts)
+        for token in tokens.tolist():
+            index.setdefault(token, []).append(claim_id)
+
+        signatures.append(minhash(tokens, a, b))
+        verdicts.append(KB_VERDICTS.index(verdict))
+        negated.append(claim_negated(record["claim"]))
+        confidences.append(float(record.get("confidence", 0.9)))
+        blob += json.dumps({
+            "claim": record["claim"],
+            "explanation": record.get("explanation", ""),
+            "sources": record.get("sources", [])
+        }, ensure_ascii=False).encode()
+        offsets.append(len(blob))
+
+    token_hashes = sorted(index)
+    token_starts = [0]
+    postings: List[int] = []
+    for token in token_hashes:
+        postings.extend(index[token])
+        token_starts.append(len(postings))
+
+    sections = [
+        np.array(signatures, dtype=np.uint32).reshape(len(verdicts), permutations).tobytes(),
+        np.array(verdicts, dtype=np.uint8).tobytes(),
+        np.array(negated, dtype=np.uint8).tobytes(),
+        np.array(confidences, dtype=np.float32).tobytes(),
+        np.array(offsets, dtype=np.uint64).tobytes(),
+        np.array(token_hashes, dtype=np.uint32).tobytes(),
+        np.array(token_starts, dtype=np.uint32).tobytes(),
+        np.array(postings, dtype=np.uint32).tobytes(),
+        bytes(blob),
+    ]
+
+    with open(path, "wb") as f:
+        f.write(_HEADER.pack(KB_MAGIC, KB_VERSION, len(verdicts), permutations,
+                             len(token_hashes), len(postings), len(blob)))
+        for section in sections:
+            f.write(section)
+            f.write(b"\0" * _pad(len(section)))
+
+    return len(verdicts)
+
+class ClaimKnowledgeBase:
+    """Read-only, memory-mapped view of a knowledge base file"""
+
+    def __init__(self, path: str, min_similarity: float = 0.6, max_candidates: int = 32):
+        self.path = path
+        self.min_similarity = min_similarity
+        self.max_candidates = max_candidates
+
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, entries, perms, tokens, postings, blob_size = _HEADER.unpack_from(self._mmap, 0)
+        if magic != KB_MAGIC or version != KB_VERSION:
+            raise ValueError(f"{path} is not a claim knowledge base (v{KB_VERSION})")
+
+        self.size = entries
+        self._a, self._b = _permutations(perms)
+
+        offset = _HEADER.size
+        def section(dtype, count):
+            nonlocal offset
+            array = np.frombuffer(self._mmap, dtype=dtype, count=count, offset=offset)
+            offset += array.nbytes + _pad(array.nbytes)
+            return array
+
+        self._signatures = section(np.uint32, entries * perms).reshape(entries, perms)
+        self._verdicts = section(np.uint8, entries)
+        self._negated = section(np.uint8, entries)
+        self._confidences = section(np.float32, entries)
+        self._records = section(np.uint64, entries + 1)
+        self._tokens = section(np.uint32, tokens)
+        self._token_starts = section(np.uint32, tokens + 1)
+        self._postings = section(np.uint32, postings)
+        self._blob_offset = offset
+
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, claim: str) -> Optional[Dict]:
+        """Return the best matching known claim's verdict, or None"""
+        tokens = claim_tokens(claim)
+        if len(tokens) == 0 or len(self._tokens) == 0:
+            self.misses += 1
+            return None
+
+        # Candidates: claims sharing the most tokens with the query
+        slots = np.searchsorted(self._tokens, tokens)
+        in_range = slots < len(self._tokens)
+        slots = slots[in_range]
+        slots = slots[self._tokens[slots] == tokens[in_range]]
+        if len(slots) == 0:
+            self.misses += 1
+            return None
+
+        postings = np.concatenate([
+            self._postings[self._token_starts[s]:self._token_starts[s + 1]] for s in slots
+        ])
+        candidates, shared = np.unique(postings, return_counts=True)
+        # "X causes Y" must never confirm or refute "X doesn't cause Y"
+        same = self._negated[candidates] == claim_negated(claim)
+        candidates, shared = candidates[same], shared[same]
+        if len(candidates) == 0:
+            self.misses += 1
+            return None
+        if len(candidates) > self.max_candidates:
+            candidates = candidates[np.argsort(-shared, kind="stable")[:self.max_candidates]]
+
+        # Rank candidates by estimated Jaccard similarity
+        signature = minhash(tokens, self._a, self._b)
+        similarity = (self._signatures[candidates] == signature).mean(axis=1)
+        best = int(np.argmax(similarity))
+        if similarity[best] < self.min_similarity:
+            self.misses += 1
+            return None
+
+        claim_id = int(candidates[best])
+        start = self._blob_offset + int(self._records[claim_id])
+        end = self._blob_offset + int(self._records[claim_id + 1])
+        record = json.loads(self._mmap[start:end].decode())
+
+        self.hits += 1
+        return {
+            "verdict": KB_VERDICTS[self._verdicts[claim_id]],
+            "confidence": round(float(self._confidences[claim_id]) * float(similarity[best]), 4),
+            "explanation": record["explanation"] or f'Matches known claim: "{record["claim"]}"',
+            "sources": record["sources"] or ["known claims database"],
+            "matched_claim": record["claim"],
+            "similarity": round(float(similarity[best]), 4)
+        }
+
+    def stats(self) -> Dict:
+        return {
+            "entries": self.size,
+            "hits": self.hits,
+            "misses": self.misses
+        }
+
+def load_knowledge_base(path: str, min_similarity: float = 0.6) -> Optional[ClaimKnowledgeBase]:
+    """Open the configured knowledge base, or None if unset/unreadable"""
+    if not path:
+        return None
+    try:
+        return ClaimKnowledgeBase(path, min_similarity=min_similarity)
+    except Exception as e:
+        print(f"Claim knowledge base unavailable ({path}): {e}")
+        return None
@@ -1,15 +1,29 @@
-import base64
+import time
+import asyncio
 import random
-from typing import Optional, Dict
+from collections import OrderedDict
+from typing import Optional, Dict, Tuple
 from dataclasses import dataclass
 import httpx
 from app.config import settings
+from app.detection.governor import governor
+from app.detection.screenshot import ScreenshotPreparer, PreparedScreenshot, screens_match
 
 @dataclass
 class CompanionComment:
     message: str
     tone: str  # "curious", "skeptical", "impressed", "concerned", "funny"
     confidence: float
+    reused: bool = False  # Repeat of the session's previous comment (screen unchanged or debounced)
+
+@dataclass
+class _SessionState:
+    comment: Optional[CompanionComment] = None
+    screen: Optional[bytes] = None  # Fingerprint of the last commented screenshot
+    commented_at: float = 0.0
+    page: Optional[Tuple[str, str]] = None  # (url, page_title) of the last comment
+    in_flight: Optional[asyncio.Future] = None
+    in_flight_page: Optional[Tuple[str, str]] = None
 
 class ScreenCompanion:
     """AI companion that watches your screen and makes comments like a friend"""
@@ -17,6 +31,19 @@ class ScreenCompanion:
     def __init__(self):
         self.anthropic_key = settings.ANTHROPIC_API_KEY if hasattr(settings, 'ANTHROPIC_API_KEY') else None
 
+        # Screenshots are downscaled and re-encoded before any vision call
+        self.screenshots = ScreenshotPreparer(
+            max_edge=settings.COMPANION_MAX_IMAGE_EDGE,
+            jpeg_quality=settings.COMPANION_JPEG_QUALITY
+        )
+
+        # Per-session screen state for dedupe/debounce (LRU, bounded)
+        self._sessions: "OrderedDict[str, _SessionState]" = OrderedDict()
+        self.max_sessions = 10000
+        self.vision_calls = 0
+        self.reused_unchanged = 0
+        self.reused_debounced = 0
+
         # Mock comment templates by content type
         self.mock_comments = {
             'news': [
@@ -57,13 +84,13 @@ class ScreenCompanion:
             ]
         }
 
-    async def _vision_analyze(self, screenshot_base64: str, context: str = "") -> Optional[Dict]:
+    async def _vision_analyze(self, screenshot_base64: str, context: str = "", media_type: str = "image/png") -> Optional[Dict]:
         """Use Claude Vision to analyze screenshot and generate comment"""
         if not self.anthropic_key:
             return None
 
         try:
-            async with httpx.AsyncClient() as client:
+            async with governor.slot("anthropic") as outcome, httpx.AsyncClient() as client:
                 response = await client.post(
                     "https://api.anthropic.com/v1/messages",
                     headers={
@@ -81,7 +108,7 @@ class ScreenCompanion:
                                     "type": "image",
                                     "source": {
                                         "type": "base64",
-                                        "media_type": "image/png",
+                                        "media_type": media_type,
                                         "data": screenshot_base64
                                     }
                                 },
@@ -102,6 +129,7 @@ CONFIDENCE: [0.0-1.0]"""
                     },
                     timeout=30.0
                 )
+                outcome.observe(response.status_code)
 
                 if response.status_code == 200:
                     data = response.json()
@@ -158,14 +186,77 @@ CONFIDENCE: [0.0-1.0]"""
         screenshot_base64: Optional[str] = None,
         url: str = "",
         page_title: str = "",
-        page_text: str = ""
+        page_text: str = "",
+        session_id: Optional[str] = None
     ) -> CompanionComment:
-        """Generate a companion comment about what's on screen"""
+        """Generate a companion comment about what's on screen
+
+        With a session_id, requests for the same url and title arriving within
+        COMPANION_MIN_INTERVAL of the last comment, or with a screenshot that
+        looks the same as the last one, reuse the previous comment instead of
+        calling the vision API.
+        """
+        screenshot = await self.screenshots.prepare(screenshot_base64) if screenshot_base64 else None
+
+        if not session_id:
+            return await self._generate_comment(screenshot, url, page_title)
+
+        state = self._sessions.get(session_id)
+        if state is None:
+            state = self._sessions[session_id] = _SessionState()
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+        self._sessions.move_to_end(session_id)
+
+        # Debounce: share an in-flight comment or repeat a very recent one, for the same page only
+        page = (url, page_title)
+        if state.in_flight is not None and state.in_flight_page == page:
+            self.reused_debounced += 1
+            return self._reuse(await asyncio.shield(state.in_flight))
+        same_page = state.comment is not None and state.page == page
+        if same_page and time.monotonic() - state.commented_at < settings.COMPANION_MIN_INTERVAL:
+            self.reused_debounced += 1
+            return self._reuse(state.comment)
+
+        screen = screenshot.fingerprint if screenshot else None
 
+        # Screen looks the same as last time: nothing new to say
+        if (same_page and screen is not None and state.screen is not None
+                and screens_match(screen, state.screen, settings.COMPANION_SCREEN_DISTANCE)):
+            self.reused_unchanged += 1
+            return self._reuse(state.comment)
+
+        in_flight = state.in_flight = asyncio.ensure_future(self._generate_comment(screenshot, url, page_title))
+        state.in_flight_page = page
+        try:
+            comment = await asyncio.shield(in_flight)
+        finally:
+            # A request for another page may have taken over meanwhile
+            superseded = state.in_flight is not in_flight
+            if not superseded:
+                state.in_flight = state.in_flight_page = None
+
+        if not superseded:
+            state.comment = comment
+            state.screen = screen
+            state.page = page
+            state.commented_at = time.monotonic()
+        return comment
+
+    def _reuse(self, comment: CompanionComment) -> CompanionComment:
+        return CompanionComment(
+            message=comment.message,
+            tone=comment.tone,
+            confidence=comment.confidence,
+            reused=True
+        )
+
+    async def _generate_comment(self, screenshot: Optional[PreparedScreenshot], url: str, page_title: str) -> CompanionComment:
         # Try vision API if screenshot provided
-        if screenshot_base64 and self.anthropic_key:
+        if screenshot and self.anthropic_key:
             context = f"URL: {url}, Title: {page_title}"
-            vision_result = await self._vision_analyze(screenshot_base64, context)
+            self.vision_calls += 1
+            vision_result = await self._vision_analyze(screenshot.data, context, screenshot.media_type)
 
             if vision_result:
                 return CompanionComment(
@@ -182,6 +273,15 @@ CONFIDENCE: [0.0-1.0]"""
             confidence=mock_result['confidence']
         )
 
+    def stats(self) -> Dict:
+        return {
+            'sessions': len(self._sessions),
+            'vision_calls': self.vision_calls,
+            'reused_unchanged_screen': self.reused_unchanged,
+            'reused_debounced': self.reused_debounced,
+            'screenshots': self.screenshots.stats()
+        }
+
     async def react_to_content(
         self,
         content_type: str,
@@ -1,9 +1,47 @@
 import re
+import heapq
 import asyncio
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Iterator, AsyncIterator, Tuple, Set
 from dataclasses import dataclass
 import httpx
 from app.config import settings
+from app.detection.claim_cache import claim_cache, claim_digest
+from app.detection.claim_kb import load_knowledge_base
+from app.detection.governor import governor
+from app.detection.singleflight import SingleFlight
+
+# Claim indicators (words/phrases that often precede factual claims), compiled
+# into one scanner together with the sentence terminators. No indicator can
+# contain [.!?], so one finditer over the text yields both the sentence
+# boundaries and the indicator hits inside each sentence. The numeric
+# indicators overlap ("$2000 million" is a dollar amount, a year and a large
+# number at once), so they share a single "number" token classified afterwards.
+_CLAIM_SCANNER = re.compile(
+    r'(?P<end>[.!?]+)'
+    r'|(?P<number>\$?\d(?:[\d,]*\d)?(?:%| (?:million|billion|thousand)\b)?)'
+    r'|(?P<study>\b(?:study|research|report|survey) (?:shows?|finds?|reveals?|proves?)\b)'
+    r'|(?P<attribution>\b(?:according to|based on|data shows?)\b)'
+    r'|(?P<experts>\b(?:scientists?|researchers?|experts?) (?:say|found|discovered)\b)'
+    r'|(?P<assertion>\b(?:fact|truth|proven|confirmed)\b)',
+    re.IGNORECASE
+)
+_YEAR = re.compile(r'\d{4}')
+
+VERDICTS = {"TRUE", "FALSE", "MISLEADING", "UNVERIFIABLE", "NEEDS_CONTEXT"}
+_BATCH_CLAIM_MARKER = re.compile(r'^\W*CLAIM\W*(\d+)\W*$', re.MULTILINE | re.IGNORECASE)
+
+def _number_indicators(token: str) -> Set[str]:
+    """Classify a numeric token into the indicators it satisfies"""
+    hits = set()
+    if token.endswith('%'):
+        hits.add('percentage')
+    if token.startswith('$'):
+        hits.add('dollars')
+    if _YEAR.search(token):
+        hits.add('year')
+    if token[-1].isalpha():
+        hits.add('large_number')
+    return hits
 
 @dataclass
 class Claim:
@@ -19,64 +57,79 @@ class FactCheckResult:
     explanation: str
     sources: List[str]
     confidence: float
+    source: str = "llm"  # "llm", "knowledge_base", "cache" or "pattern"
+    deadline_exceeded: bool = False  # Pattern fallback because the time budget ran out
 
 class FactChecker:
     def __init__(self):
         self.anthropic_key = settings.ANTHROPIC_API_KEY if hasattr(settings, 'ANTHROPIC_API_KEY') else None
+        self.cache = claim_cache
 
-        # Claim indicators (words/phrases that often precede factual claims)
-        self.claim_indicators = [
-            r'\d+%',  # Percentages
-            r'\$[\d,]+',  # Dollar amounts
-            r'\d{4}',  # Years
-            r'\b(study|research|report|survey) (shows?|finds?|reveals?|proves?)\b',
-            r'\b(according to|based on|data shows?)\b',
-            r'\b(scientists?|researchers?|experts?) (say|found|discovered)\b',
-            r'\b(fact|truth|proven|confirmed)\b',
-            r'\b\d+ (?:million|billion|thousand)\b',  # Large numbers
-        ]
-
-    def extract_claims(self, text: str) -> List[Claim]:
-        """Extract factual claims from text"""
-        claims = []
-        sentences = re.split(r'[.!?]+', text)
+        # Known claims are answered locally before the cache or LLM
+        self.knowledge_base = load_knowledge_base(settings.CLAIM_KB_PATH, settings.CLAIM_KB_MIN_SIMILARITY)
 
-        pos = 0
-        for sentence in sentences:
-            sentence = sentence.strip()
-            if not sentence:
-                pos += len(sentence) + 1
-                continue
+        # LLM requests that outlived their time budget keep running so their
+        # verdicts still reach the cache; hold references until they finish
+        self._background = set()
 
-            # Check if sentence contains claim indicators
-            confidence = 0.0
-            for pattern in self.claim_indicators:
-                if re.search(pattern, sentence, re.IGNORECASE):
-                    confidence += 0.3
+        # Claims being checked right now, by claim digest; concurrent requests
+        # for the same claim await the one LLM call (result: verdict dict or None)
+        self.in_flight = SingleFlight()
 
+    def extract_claims(self, text: str, max_claims: int = 5) -> List[Claim]:
+        """Extract the top factual claims from text in a single scan"""
+        heap = []
+        for seq, (start, end, hits) in enumerate(self._iter_sentences(text)):
             # Must have at least one indicator
-            if confidence > 0:
-                confidence = min(confidence, 1.0)
-                claims.append(Claim(
-                    text=sentence,
-                    start_pos=pos,
-                    end_pos=pos + len(sentence),
-                    confidence=confidence
-                ))
+            if not hits:
+                continue
 
-            pos += len(sentence) + 1
+            # Each distinct indicator adds 0.3, capped at 1.0
+            entry = (min(len(hits) * 0.3, 1.0), -seq, start, end)
+            if len(heap) < max_claims:
+                heapq.heappush(heap, entry)
+            elif entry > heap[0]:
+                heapq.heapreplace(heap, entry)
 
-        # Sort by confidence, return top 5
-        claims.sort(key=lambda x: x.confidence, reverse=True)
-        return claims[:5]
+        # Highest confidence first, earlier sentences win ties
+        claims = []
+        for confidence, _, start, end in sorted(heap, reverse=True):
+            sentence = text[start:end]
+            stripped = sentence.lstrip()
+            start += len(sentence) - len(stripped)
+            stripped = stripped.rstrip()
+            claims.append(Claim(
+                text=stripped,
+                start_pos=start,
+                end_pos=start + len(stripped),
+                confidence=confidence
+            ))
+        return claims
 
-    async def _anthropic_fact_check(self, claim: str) -> Optional[Dict]:
-        """Use Claude to fact-check a claim"""
+    def _iter_sentences(self, text: str) -> Iterator[Tuple[int, int, Set[str]]]:
+        """Lazily yield (start, end, indicator hits) for each sentence span"""
+        start = 0
+        hits = set()
+        for match in _CLAIM_SCANNER.finditer(text):
+            kind = match.lastgroup
+            if kind == 'end':
+                yield start, match.start(), hits
+                start = match.end()
+                hits = set()
+            elif kind == 'number':
+                hits.update(_number_indicators(match.group()))
+            else:
+                hits.add(kind)
+        if start < len(text):
+            yield start, len(text), hits
+
+    async def _anthropic_request(self, prompt: str, max_tokens: int) -> Optional[str]:
+        """Send a single-turn prompt to Claude and return the text reply"""
         if not self.anthropic_key:
             return None
 
         try:
-            async with httpx.AsyncClient() as client:
+            async with governor.slot("anthropic") as outcome, httpx.AsyncClient() as client:
                 response = await client.post(
                     "https://api.anthropic.com/v1/messages",
                     headers={
@@ -86,37 +139,19 @@ class FactChecker:
                     },
                     json={
                         "model": "claude-3-5-sonnet-20241022",
-                        "max_tokens": 500,
+                        "max_tokens": max_tokens,
                         "messages": [{
                             "role": "user",
-                            "content": f"""Fact-check this claim: "{claim}"
-
-Respond in this exact format:
-VERDICT: [TRUE/FALSE/MISLEADING/UNVERIFIABLE/NEEDS_CONTEXT]
-CONFIDENCE: [0.0-1.0]
-EXPLANATION: [2-3 sentence explanation]
-SOURCES: [Comma-separated list of general source types, e.g., "scientific studies, government data"]"""
+                            "content": prompt
                         }]
                     },
                     timeout=20.0
                 )
+                outcome.observe(response.status_code)
 
                 if response.status_code == 200:
                     data = response.json()
-                    content = data['content'][0]['text']
-
-                    # Parse response
-                    verdict_match = re.search(r'VERDICT:\s*(\w+)', content)
-                    confidence_match = re.search(r'CONFIDENCE:\s*([\d.]+)', content)
-                    explanation_match = re.search(r'EXPLANATION:\s*(.+?)(?=SOURCES:|$)', content, re.DOTALL)
-                    sources_match = re.search(r'SOURCES:\s*(.+?)$', content, re.DOTALL)
-
-                    return {
-                        'verdict': verdict_match.group(1) if verdict_match else 'UNVERIFIABLE',
-                        'confidence': float(confidence_match.group(1)) if confidence_match else 0.5,
-                        'explanation': explanation_match.group(1).strip() if explanation_match else '',
-                        'sources': [s.strip() for s in sources_match.group(1).split(',')] if sources_match else []
-                    }
+                    return data['content'][0]['text']
 
                 return None
 
@@ -124,6 +159,80 @@ SOURCES: [Comma-separated list of general source types, e.g., "scientific studie
             print(f"Anthropic API error: {e}")
             return None
 
+    def _parse_verdict(self, content: str, strict: bool = False) -> Optional[Dict]:
+        """Parse a VERDICT/CONFIDENCE/EXPLANATION/SOURCES block"""
+        verdict_match = re.search(r'VERDICT:\s*(\w+)', content)
+        confidence_match = re.search(r'CONFIDENCE:\s*([\d.]+)', content)
+        explanation_match = re.search(r'EXPLANATION:\s*(.+?)(?=SOURCES:|$)', content, re.DOTALL)
+        sources_match = re.search(r'SOURCES:\s*(.+?)$', content, re.DOTALL)
+
+        # In batch replies a block without a recognizable verdict is a parse failure
+        if strict and (not verdict_match or verdict_match.group(1).upper() not in VERDICTS):
+            return None
+
+        try:
+            confidence = float(confidence_match.group(1)) if confidence_match else 0.5
+        except ValueError:
+            confidence = 0.5
+
+        return {
+            'verdict': verdict_match.group(1).upper() if verdict_match else 'UNVERIFIABLE',
+            'confidence': min(max(confidence, 0.0), 1.0),
+            'explanation': explanation_match.group(1).strip() if explanation_match else '',
+            'sources': [s.strip() for s in sources_match.group(1).split(',')] if sources_match else []
+        }
+
+    async def _anthropic_fact_check(self, claim: str) -> Optional[Dict]:
+        """Use Claude to fact-check a claim"""
+        content = await self._anthropic_request(f"""Fact-check this claim: "{claim}"
+
+Respond in this exact format:
+VERDICT: [TRUE/FALSE/MISLEADING/UNVERIFIABLE/NEEDS_CONTEXT]
+CONFIDENCE: [0.0-1.0]
+EXPLANATION: [2-3 sentence explanation]
+SOURCES: [Comma-separated list of general source types, e.g., "scientific studies, government data"]""", 500)
+
+        if content is None:
+            return None
+        return self._parse_verdict(content)
+
+    async def _anthropic_batch_fact_check(self, claims: List[str]) -> Optional[List[Optional[Dict]]]:
+        """Use one Claude request to fact-check several claims
+
+        Returns None if the request itself failed, otherwise one entry per
+        claim where None marks a verdict that could not be parsed out.
+        """
+        if len(claims) == 1:
+            result = await self._anthropic_fact_check(claims[0])
+            return [result] if result else None
+
+        numbered = "\n".join(f'{i}. "{claim}"' for i, claim in enumerate(claims, 1))
+        content = await self._anthropic_request(f"""Fact-check each of these {len(claims)} claims independently:
+{numbered}
+
+For every claim respond with a block in this exact format, in the same order:
+CLAIM: [claim number]
+VERDICT: [TRUE/FALSE/MISLEADING/UNVERIFIABLE/NEEDS_CONTEXT]
+CONFIDENCE: [0.0-1.0]
+EXPLANATION: [2-3 sentence explanation]
+SOURCES: [Comma-separated list of general source types, e.g., "scientific studies, government data"]""", 400 * len(claims))
+
+        if content is None:
+            return None
+
+        results: List[Optional[Dict]] = [None] * len(claims)
+
+        # Split the reply on CLAIM markers; each block is parsed like a single reply
+        markers = list(_BATCH_CLAIM_MARKER.finditer(content))
+        for marker, following in zip(markers, markers[1:] + [None]):
+            index = int(marker.group(1)) - 1
+            if not 0 <= index < len(claims) or results[index] is not None:
+                continue
+            block = content[marker.end():following.start() if following else len(content)]
+            results[index] = self._parse_verdict(block.strip(), strict=True)
+
+        return results
+
     def _pattern_fact_check(self, claim: str) -> Dict:
         """Pattern-based fact checking (mock when no API)"""
         claim_lower = claim.lower()
@@ -163,41 +272,174 @@ SOURCES: [Comma-separated list of general source types, e.g., "scientific studie
             'sources': ['automated analysis']
         }
 
-    async def check_claim(self, claim: str) -> FactCheckResult:
-        """Fact-check a single claim"""
-        # Try API first
-        api_result = await self._anthropic_fact_check(claim)
-
-        if api_result:
-            return FactCheckResult(
-                claim=claim,
-                verdict=api_result['verdict'],
-                explanation=api_result['explanation'],
-                sources=api_result['sources'],
-                confidence=api_result['confidence']
-            )
-
-        # Fallback to pattern-based
-        pattern_result = self._pattern_fact_check(claim)
+    def _build_result(self, claim: str, result: Dict, source: str = "llm", deadline_exceeded: bool = False) -> FactCheckResult:
         return FactCheckResult(
             claim=claim,
-            verdict=pattern_result['verdict'],
-            explanation=pattern_result['explanation'],
-            sources=pattern_result['sources'],
-            confidence=pattern_result['confidence']
+            verdict=result['verdict'],
+            explanation=result['explanation'],
+            sources=result['sources'],
+            confidence=result['confidence'],
+            source=source,
+            deadline_exceeded=deadline_exceeded
         )
 
-    async def check_text(self, text: str) -> List[FactCheckResult]:
+    async def _verify_batch(
+        self,
+        claims: List[str],
+        flights: Optional[Dict[str, asyncio.Future]] = None
+    ) -> Optional[List[Optional[Dict]]]:
+        """Fact-check a batch with the LLM and cache every parsed verdict
+
+        Flights led for these claims are resolved as verdicts land; claims a
+        multi-claim reply left unparsed stay open for the caller's retry.
+        """
+        flights = flights or {}
+        results = None
+        try:
+            results = await self._anthropic_batch_fact_check(claims)
+            if results:
+                await asyncio.gather(*[
+                    self.cache.put(claim, result) for claim, result in zip(claims, results) if result
+                ])
+        finally:
+            final = results is None or len(claims) == 1
+            for claim, result in zip(claims, results or [None] * len(claims)):
+                if claim in flights and (result or final):
+                    self.in_flight.finish(claim_digest(claim), flights[claim], result)
+        return results
+
+    def _release(self, claims: List[str], flights: Dict[str, asyncio.Future]):
+        """Resolve any flights still open for claims (no verdict), so later requests check them anew"""
+        for claim in claims:
+            if claim in flights:
+                self.in_flight.finish(claim_digest(claim), flights[claim])
+
+    async def _follow(self, flight: asyncio.Future) -> List[Optional[Dict]]:
+        """Await another request's LLM call for a claim (shaped like a one-claim batch)"""
+        try:
+            return [await asyncio.shield(flight)]
+        except Exception:
+            return [None]
+
+    async def iter_check_claims(
+        self,
+        claims: List[str],
+        time_budget: Optional[float] = None
+    ) -> AsyncIterator[Tuple[int, FactCheckResult]]:
+        """Yield (index, result) for every claim as soon as its verdict resolves
+
+        Known-claim and cached verdicts come first, then the misses batch by
+        batch in the order their LLM requests complete. Once time_budget seconds have
+        passed, unresolved claims get pattern-based verdicts while their LLM
+        requests finish in the background and fill the cache.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + time_budget if time_budget else None
+
+        positions: Dict[str, List[int]] = {}
+        for index, claim in enumerate(claims):
+            positions.setdefault(claim, []).append(index)
+        unique = []
+        for claim in positions:
+            known = self.knowledge_base.lookup(claim) if self.knowledge_base else None
+            if known:
+                for index in positions[claim]:
+                    yield index, self._build_result(claim, known, source="knowledge_base")
+            else:
+                unique.append(claim)
+
+        cached = await asyncio.gather(*[self.cache.get(claim) for claim in unique])
+        misses = []
+        for claim, result in zip(unique, cached):
+            if result:
+                for index in positions[claim]:
+                    yield index, self._build_result(claim, result, source="cache")
+            else:
+                misses.append(claim)
+
+        if not misses:
+            return
+
+        if not self.anthropic_key:
+            for claim in misses:
+                for index in positions[claim]:
+                    yield index, self._build_result(claim, self._pattern_fact_check(claim), source="pattern")
+            return
+
+        # Claims another request is already checking are awaited, not re-sent
+        pending = {}
+        flights: Dict[str, asyncio.Future] = {}
+        own = []
+        for claim in misses:
+            shared = self.in_flight.join(claim_digest(claim))
+            if shared is not None:
+                pending[asyncio.ensure_future(self._follow(shared))] = [claim]
+            else:
+                flights[claim] = self.in_flight.begin(claim_digest(claim))
+                own.append(claim)
+
+        batch_size = max(settings.FACTCHECK_BATCH_SIZE, 1)
+        for batch in (own[i:i + batch_size] for i in range(0, len(own), batch_size)):
+            pending[asyncio.ensure_future(self._verify_batch(batch, flights))] = batch
+
+        try:
+            while pending:
+                timeout = max(deadline - loop.time(), 0) if deadline else None
+                done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+
+                if not done:
+                    # Out of time: answer the rest locally
+                    for claim in (claim for batch in pending.values() for claim in batch):
+                        fallback = self._build_result(
+                            claim, self._pattern_fact_check(claim),
+                            source="pattern", deadline_exceeded=True
+                        )
+                        for index in positions[claim]:
+                            yield index, fallback
+                    return
+
+                for task in done:
+                    batch = pending.pop(task)
+                    results = task.result()
+
+                    # Only claims missing from a multi-claim reply are retried one by one
+                    retry_unparsed = results is not None and len(batch) > 1
+                    for claim, result in zip(batch, results or [None] * len(batch)):
+                        if result is None and retry_unparsed:
+                            pending[asyncio.ensure_future(self._verify_batch([claim], flights))] = [claim]
+                            continue
+                        if result:
+                            checked = self._build_result(claim, result)
+                        else:
+                            checked = self._build_result(claim, self._pattern_fact_check(claim), source="pattern")
+                        for index in positions[claim]:
+                            yield index, checked
+        finally:
+            # Unfinished LLM calls (deadline or abandoned stream) still fill the cache
+            for task, batch in pending.items():
+                self._background.add(task)
+                task.add_done_callback(self._background.discard)
+                # Nobody retries what the reply left unparsed; release those flights
+                task.add_done_callback(lambda _, batch=batch: self._release(batch, flights))
+
+            # Never leave followers waiting on a claim nobody will retry
+            waiting = {claim for batch in pending.values() for claim in batch}
+            for claim, flight in flights.items():
+                if claim not in waiting:
+                    self.in_flight.finish(claim_digest(claim), flight)
+
+    async def check_claims(self, claims: List[str], time_budget: Optional[float] = None) -> List[FactCheckResult]:
+        """Fact-check several claims, packing cache misses into batched LLM requests"""
+        results: List[Optional[FactCheckResult]] = [None] * len(claims)
+        async for index, result in self.iter_check_claims(claims, time_budget):
+            results[index] = result
+        return results
+
+    async def check_text(self, text: str, time_budget: Optional[float] = None) -> List[FactCheckResult]:
         """Extract and fact-check all claims in text"""
         claims = self.extract_claims(text)
 
         if not claims:
             return []
 
-        # Check all claims concurrently
-        results = await asyncio.gather(*[
-            self.check_claim(claim.text)
-            for claim in claims
-        ])
-
-        return results
+        return await self.check_claims([claim.text for claim in claims], time_budget)
@@ -0,0 +1,191 @@
+"""
+Outbound concurrency governor for LLM/model providers
+
+Every call to Anthropic, Hugging Face or GPTZero takes a slot from its
+provider's limiter first. Each limiter combines:
+- an adaptive concurrency limit (AIMD): +1 per limit's worth of healthy
+  responses, halved on 429/503/timeouts, trimmed when latency degrades
+- a token bucket capping the request rate
+- a priority queue so interactive calls overtake background work
+"""
+import time
+import heapq
+import asyncio
+import itertools
+from contextlib import asynccontextmanager
+from typing import Dict, Optional
+import httpx
+from app.config import settings
+
+INTERACTIVE = 0
+BACKGROUND = 1
+
+# Statuses that mean "slow down"
+OVERLOAD_STATUSES = {429, 503}
+
+DEFAULT_LIMITS = {
+    "anthropic": {"initial": 4, "min_limit": 1, "max_limit": 32, "rate": 10.0, "burst": 20, "target_latency": 8.0},
+    "huggingface": {"initial": 4, "min_limit": 1, "max_limit": 16, "rate": 5.0, "burst": 10, "target_latency": 5.0},
+    "gptzero": {"initial": 2, "min_limit": 1, "max_limit": 8, "rate": 2.0, "burst": 4, "target_latency": 5.0},
+}
+
+class SlotOutcome:
+    """Handed to the caller inside a slot to report how the call went"""
+
+    def __init__(self):
+        self.status: Optional[int] = None
+
+    def observe(self, status_code: int):
+        self.status = status_code
+
+class ProviderLimiter:
+    def __init__(self, name: str, initial: int, min_limit: int, max_limit: int,
+                 rate: float, burst: int, target_latency: float):
+        self.name = name
+        self.limit = float(initial)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.rate = rate
+        self.burst = burst
+        self.target_latency = target_latency
+
+        self.tokens = float(burst)
+        self._refilled_at = time.monotonic()
+        self._last_decrease = 0.0
+
+        self.in_flight = 0
+        self._waiters = []  # heap of (priority, seq, future)
+        self._seq = itertools.count()
+        self._wakeup: Optional[asyncio.TimerHandle] = None
+
+        # Metrics
+        self.completed = 0
+        self.overloaded = 0
+        self.errors = 0
+        self.latency_ewma = 0.0
+        self.queue_wait_ewma = 0.0
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self._refilled_at) * self.rate)
+        self._refilled_at = now
+
+    def _dispatch(self):
+        """Hand free slots to the highest-priority waiters"""
+        self._wakeup = None
+        while self._waiters and self.in_flight < int(self.limit):
+            priority, _, future = self._waiters[0]
+            if future.done():
+                heapq.heappop(self._waiters)
+                continue
+
+            self._refill()
+            if self.tokens < 1:
+                # Rate limited: try again once a token has accrued
+                delay = (1 - self.tokens) / self.rate
+                self._wakeup = asyncio.get_running_loop().call_later(delay, self._dispatch)
+                return
+
+            heapq.heappop(self._waiters)
+            self.tokens -= 1
+            self.in_flight += 1
+            future.set_result(None)
+
+    async def acquire(self, priority: int = INTERACTIVE):
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), future))
+        if self._wakeup is None:
+            self._dispatch()
+
+        queued_at = time.monotonic()
+        try:
+            await future
+        except asyncio.CancelledError:
+            # Granted just as we were cancelled: give the slot back
+            if future.done() and not future.cancelled():
+                self.release(None, 0.0)
+            raise
+        self.queue_wait_ewma = 0.9 * self.queue_wait_ewma + 0.1 * (time.monotonic() - queued_at)
+
+    def release(self, status: Optional[int], latency: float, failed: bool = False):
+        self.in_flight -= 1
+        self._adapt(status, latency, failed)
+        if self._wakeup is None:
+            self._dispatch()
+
+    def _adapt(self, status: Optional[int], latency: float, failed: bool):
+        now = time.monotonic()
+        overloaded = status in OVERLOAD_STATUSES or failed
+
+        if overloaded:
+            self.overloaded += status in OVERLOAD_STATUSES
+            self.errors += failed
+            # Halve at most once per latency window so one burst of 429s counts once
+            if now - self._last_decrease > max(self.latency_ewma, 1.0):
+                self.limit = max(self.min_limit, self.limit / 2)
+                self._last_decrease = now
+            return
+
+        if status is None:
+            return
+
+        self.completed += 1
+        self.latency_ewma = latency if self.completed == 1 else 0.8 * self.latency_ewma + 0.2 * latency
+        if latency > self.target_latency * 2:
+            self.limit = max(self.min_limit, self.limit * 0.9)
+        elif latency <= self.target_latency:
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+
+    def stats(self) -> Dict:
+        queued = [w for w in self._waiters if not w[2].done()]
+        return {
+            "limit": round(self.limit, 2),
+            "in_flight": self.in_flight,
+            "queued": len(queued),
+            "queued_interactive": sum(1 for w in queued if w[0] == INTERACTIVE),
+            "tokens": round(self.tokens, 2),
+            "completed": self.completed,
+            "overloaded": self.overloaded,
+            "errors": self.errors,
+            "latency_ewma_s": round(self.latency_ewma, 3),
+            "queue_wait_ewma_s": round(self.queue_wait_ewma, 3)
+        }
+
+class OutboundGovernor:
+    def __init__(self, limits: Dict[str, Dict]):
+        self.limits = limits
+        self.providers: Dict[str, ProviderLimiter] = {}
+
+    def limiter(self, provider: str) -> ProviderLimiter:
+        if provider not in self.providers:
+            config = {**DEFAULT_LIMITS.get(provider, DEFAULT_LIMITS["huggingface"]), **self.limits.get(provider, {})}
+            self.providers[provider] = ProviderLimiter(provider, **config)
+        return self.providers[provider]
+
+    @asynccontextmanager
+    async def slot(self, provider: str, interactive: bool = True):
+        """Hold one outbound request slot for provider
+
+        Usage:
+            async with governor.slot("anthropic") as outcome:
+                response = await client.post(...)
+                outcome.observe(response.status_code)
+        """
+        limiter = self.limiter(provider)
+        await limiter.acquire(INTERACTIVE if interactive else BACKGROUND)
+
+        outcome = SlotOutcome()
+        started = time.monotonic()
+        failed = False
+        try:
+            yield outcome
+        except (httpx.TimeoutException, httpx.NetworkError):
+            failed = True
+            raise
+        finally:
+            limiter.release(outcome.status, time.monotonic() - started, failed)
+
+    def stats(self) -> Dict:
+        return {name: limiter.stats() for name, limiter in self.providers.items()}
+
+governor = OutboundGovernor(settings.outbound_limits)
@@ -0,0 +1,125 @@
+import base64
+import hashlib
+import io
+import asyncio
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+from PIL import Image
+
+# Mean per-pixel brightness change (0-255) tolerated between "unchanged" screens
+_MAX_BRIGHTNESS_DELTA = 10
+
+@dataclass
+class PreparedScreenshot:
+    data: str  # base64, ready for the vision API
+    media_type: str
+    fingerprint: bytes  # see screen_fingerprint
+    width: int
+    height: int
+    original_bytes: int
+    prepared_bytes: int
+
+class ScreenshotPreparer:
+    """Decode once, downscale, re-encode compactly; results cached by content hash"""
+
+    def __init__(self, max_edge: int = 1280, jpeg_quality: int = 80, cache_size: int = 256):
+        self.max_edge = max_edge
+        self.jpeg_quality = jpeg_quality
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, PreparedScreenshot]" = OrderedDict()
+
+        self.prepared = 0
+        self.cache_hits = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    async def prepare(self, screenshot_base64: str) -> Optional[PreparedScreenshot]:
+        """Return a vision-ready screenshot, or None if it is not an image"""
+        if ',' in screenshot_base64:
+            screenshot_base64 = screenshot_base64.split(',')[1]
+
+        digest = hashlib.sha256(screenshot_base64.encode()).hexdigest()
+        cached = self._cache.get(digest)
+        if cached:
+            self._cache.move_to_end(digest)
+            self.cache_hits += 1
+            return cached
+
+        try:
+            raw = base64.b64decode(screenshot_base64)
+            prepared = await asyncio.to_thread(self._prepare_bytes, raw)
+        except Exception as e:
+            print(f"Screenshot decode error: {e}")
+            return None
+
+        self._cache[digest] = prepared
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+        self.prepared += 1
+        self.bytes_in += prepared.original_bytes
+        self.bytes_out += prepared.prepared_bytes
+        return prepared
+
+    def _prepare_bytes(self, raw: bytes) -> PreparedScreenshot:
+        image = Image.open(io.BytesIO(raw))
+        source_format = image.format
+
+        # JPEG sources can be decoded straight at reduced scale
+        image.draft('RGB', (self.max_edge, self.max_edge))
+        image.load()
+
+        resized = max(image.size) > self.max_edge
+        if resized:
+            image.thumbnail((self.max_edge, self.max_edge), Image.LANCZOS, reducing_gap=3.0)
+
+        if image.mode != 'RGB':
+            background = Image.new('RGB', image.size, 'white')
+            rgba = image.convert('RGBA')
+            background.paste(rgba, mask=rgba.getchannel('A'))
+            image = background
+
+        out = io.BytesIO()
+        image.save(out, 'JPEG', quality=self.jpeg_quality, optimize=True)
+        encoded, media_type = out.getvalue(), 'image/jpeg'
+
+        # Small originals that already compress better are forwarded as-is
+        if not resized and len(raw) <= len(encoded) and source_format in ('PNG', 'JPEG', 'GIF', 'WEBP'):
+            encoded, media_type = raw, f'image/{source_format.lower()}'
+
+        return PreparedScreenshot(
+            data=base64.b64encode(encoded).decode(),
+            media_type=media_type,
+            fingerprint=screen_fingerprint(image),
+            width=image.size[0],
+            height=image.size[1],
+            original_bytes=len(raw),
+            prepared_bytes=len(encoded)
+        )
+
+    def stats(self) -> dict:
+        return {
+            'prepared': self.prepared,
+            'cache_hits': self.cache_hits,
+            'bytes_in': self.bytes_in,
+            'bytes_out': self.bytes_out
+        }
+
+def screen_fingerprint(image: Image.Image) -> bytes:
+    """9x8 grayscale thumbnail used to compare screens perceptually"""
+    # reducing_gap shrinks by integer factors first, so full-size screenshots stay cheap
+    return image.resize((9, 8), Image.BILINEAR, reducing_gap=2.0).convert('L').tobytes()
+
+def _difference_hash(fingerprint: bytes) -> int:
+    bits = 0
+    for row in range(8):
+        for col in range(8):
+            bits = (bits << 1) | (fingerprint[row * 9 + col] > fingerprint[row * 9 + col + 1])
+    return bits
+
+def screens_match(a: bytes, b: bytes, max_distance: int) -> bool:
+    """True if two fingerprints have the same layout (dHash) and brightness"""
+    distance = bin(_difference_hash(a) ^ _difference_hash(b)).count('1')
+    brightness_delta = sum(abs(x - y) for x, y in zip(a, b)) / len(a)
+    return distance <= max_distance and brightness_delta <= _MAX_BRIGHTNESS_DELTA
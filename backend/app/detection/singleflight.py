@@ -0,0 +1,77 @@
+"""
+Single-flight request coalescing
+
+Concurrent callers asking for the same key share one in-flight call instead
+of each hitting the provider. The shared call runs in its own task, so a
+caller that disconnects does not cancel it for everyone else.
+
+    result = await flight.do(key, lambda: expensive(key))
+
+Callers that batch work themselves can use the lower-level begin/join/finish.
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+class SingleFlight:
+    def __init__(self):
+        self._flights: Dict[Hashable, asyncio.Future] = {}
+        self._tasks = set()
+
+        self.leaders = 0
+        self.followers = 0
+
+    def join(self, key: Hashable) -> Optional[asyncio.Future]:
+        """The in-flight future for key, or None if nobody is working on it"""
+        future = self._flights.get(key)
+        if future is not None:
+            self.followers += 1
+        return future
+
+    def begin(self, key: Hashable) -> asyncio.Future:
+        """Claim key; the caller must finish() the returned future"""
+        future = asyncio.get_running_loop().create_future()
+        # Followers may all be gone by the time an error lands
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._flights[key] = future
+        self.leaders += 1
+        return future
+
+    def finish(self, key: Hashable, future: asyncio.Future, result: Any = None,
+               error: Optional[BaseException] = None):
+        """Resolve a flight started with begin() (no-op if already resolved)"""
+        if self._flights.get(key) is future:
+            del self._flights[key]
+        if future.done():
+            return
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable]) -> Any:
+        """Return fn()'s result, sharing one call among concurrent callers of key"""
+        future = self.join(key)
+        if future is None:
+            future = self.begin(key)
+            task = asyncio.ensure_future(fn())
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+            task.add_done_callback(lambda t: self._settle(key, future, t))
+        return await asyncio.shield(future)
+
+    def _settle(self, key: Hashable, future: asyncio.Future, task: asyncio.Task):
+        if task.cancelled():
+            self.finish(key, future, error=asyncio.CancelledError())
+        elif task.exception() is not None:
+            self.finish(key, future, error=task.exception())
+        else:
+            self.finish(key, future, task.result())
+
+    def stats(self) -> Dict:
+        calls = self.leaders + self.followers
+        return {
+            'in_flight': len(self._flights),
+            'leaders': self.leaders,
+            'followers': self.followers,
+            'coalesced_rate': round(self.followers / calls, 4) if calls > 0 else 0
+        }
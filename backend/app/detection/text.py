@@ -6,6 +6,8 @@ from dataclasses import dataclass
 import httpx
 import numpy as np
 from app.config import settings
+from app.detection.governor import governor
+from app.detection.singleflight import SingleFlight
 
 @dataclass
 class TextDetectionResult:
@@ -18,6 +20,9 @@ class TextDetectionResult:
 class TextDetector:
     def __init__(self):
         self.api_key = settings.GPTZERO_API_KEY
+
+        # Concurrent requests for the same text share one detection
+        self.in_flight = SingleFlight()
         
         # AI writing patterns with weights
         self.ai_patterns = {
@@ -61,8 +66,11 @@ class TextDetector:
             'informal_caps': (r'\b[A-Z]{2,}\b', -0.05),
         }
     
-    async def detect(self, text: str, source_platform: str = None) -> TextDetectionResult:
-        """Main detection method"""
+    async def detect(self, text: str, source_platform: str = None, interactive: bool = True) -> TextDetectionResult:
+        """Main detection method
+
+        interactive=False queues provider calls behind user-facing requests.
+        """
         
         # Generate content hash
         content_hash = hashlib.sha256(text.encode()).hexdigest()
@@ -78,9 +86,16 @@ class TextDetector:
                 content_hash=content_hash
             )
         
+        return await self.in_flight.do(
+            (content_hash, source_platform),
+            lambda: self._detect(text, content_hash, word_count, source_platform, interactive)
+        )
+
+    async def _detect(self, text: str, content_hash: str, word_count: int,
+                      source_platform: str, interactive: bool) -> TextDetectionResult:
         # Run detection methods in parallel
         # Try Hugging Face first (free), falls back to GPTZero if needed
-        api_task = self._huggingface_detect(text)
+        api_task = self._huggingface_detect(text, interactive)
         pattern_task = asyncio.to_thread(self._pattern_analysis, text)
 
         api_result, pattern_result = await asyncio.gather(
@@ -98,7 +113,7 @@ class TextDetector:
         
         return final_result
     
-    async def _huggingface_detect(self, text: str) -> Dict:
+    async def _huggingface_detect(self, text: str, interactive: bool = True) -> Dict:
         """Call Hugging Face Inference API (FREE!)"""
 
         # Try multiple models in order of preference
@@ -110,7 +125,7 @@ class TextDetector:
 
         for model in models_to_try:
             try:
-                async with httpx.AsyncClient() as client:
+                async with governor.slot("huggingface", interactive) as outcome, httpx.AsyncClient() as client:
                     response = await client.post(
                         f"https://api-inference.huggingface.co/models/{model}",
                         headers={
@@ -119,6 +134,7 @@ class TextDetector:
                         json={"inputs": text[:512]},  # Limit to 512 chars for speed
                         timeout=15.0
                     )
+                    outcome.observe(response.status_code)
 
                     if response.status_code == 200:
                         data = response.json()
@@ -158,13 +174,13 @@ class TextDetector:
         print("All Hugging Face models failed, using pattern matching only")
         return {'ai_probability': None, 'available': False}
 
-    async def _gptzero_detect(self, text: str) -> Dict:
+    async def _gptzero_detect(self, text: str, interactive: bool = True) -> Dict:
         """Call GPTZero API (PAID - Fallback only)"""
         if not self.api_key:
             return {'ai_probability': None, 'available': False}
 
         try:
-            async with httpx.AsyncClient() as client:
+            async with governor.slot("gptzero", interactive) as outcome, httpx.AsyncClient() as client:
                 response = await client.post(
                     "https://api.gptzero.me/v2/predict/text",
                     headers={
@@ -174,6 +190,7 @@ class TextDetector:
                     json={"document": text},
                     timeout=15.0
                 )
+                outcome.observe(response.status_code)
 
                 if response.status_code == 200:
                     data = response.json()
@@ -316,8 +333,8 @@ class TextDetector:
         )
     
     async def detect_batch(self, texts: list) -> list:
-        """Detect multiple texts in parallel"""
-        tasks = [self.detect(t['content'], t.get('source_platform')) for t in texts]
+        """Detect multiple texts in parallel (provider calls queue as background work)"""
+        tasks = [self.detect(t['content'], t.get('source_platform'), interactive=False) for t in texts]
         return await asyncio.gather(*tasks)
     
     def is_likely_bot(self, result: TextDetectionResult, tweet_metadata: Dict = None) -> bool:
@@ -0,0 +1,258 @@
+"""
+Streaming top-K of viewed verifications (Space-Saving)
+
+Ranking verifications by view_count meant sorting the whole table, or
+keeping an index on a column every view updates. Views are instead counted
+as they arrive in Space-Saving summaries: at most `capacity` keys each, with
+counts that overestimate by at most their recorded error, and any key viewed
+more than total/capacity times guaranteed to be present.
+
+- all-time: one summary
+- trending: one summary per HEAVY_HITTERS_SLICE_S slice over the last
+  HEAVY_HITTERS_WINDOW_S, merged for the requested window
+
+Each process checkpoints its summaries to heavy_hitter_checkpoints every
+HEAVY_HITTERS_CHECKPOINT_S under its node id. Queries merge every node's
+latest checkpoint with this process's live counts. Checkpoints of nodes that
+stopped updating (restarted or crashed workers, or the backfill seed) are
+claimed with DELETE ... RETURNING by exactly one live node and folded into
+its own summaries.
+"""
+import json
+import time
+import heapq
+import asyncio
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import select, delete
+from app.config import settings
+from app.database import engine, dialect_insert
+from app.models import HeavyHitterCheckpoint
+from app.content_sketches import node_id
+
+class SpaceSaving:
+    """Approximate top-k counts in fixed space (Metwally et al.)"""
+
+    def __init__(self, capacity: int):
+        self.capacity = max(capacity, 1)
+        self.total = 0
+        # key -> [count, error]; count - error <= true count <= count
+        self._counts: Dict[str, List[int]] = {}
+        # (count, key) min-heap, with stale entries skipped on pop
+        self._heap: List[Tuple[int, str]] = []
+
+    def __len__(self) -> int:
+        return len(self._counts)
+
+    def add(self, key: str, count: int = 1):
+        if count <= 0:
+            return
+        self.total += count
+        entry = self._counts.get(key)
+        if entry is None:
+            if len(self._counts) < self.capacity:
+                entry = self._counts[key] = [0, 0]
+            else:
+                # Replace the smallest counter; the newcomer inherits its count as error
+                floor, evicted = self._pop_min()
+                del self._counts[evicted]
+                entry = self._counts[key] = [floor, floor]
+        entry[0] += count
+        heapq.heappush(self._heap, (entry[0], key))
+        if len(self._heap) > 4 * self.capacity:
+            self._heap = [(entry[0], key) for key, entry in self._counts.items()]
+            heapq.heapify(self._heap)
+
+    def _pop_min(self) -> Tuple[int, str]:
+        while True:
+            count, key = heapq.heappop(self._heap)
+            entry = self._counts.get(key)
+            if entry is not None and entry[0] == count:
+                return count, key
+
+    def top(self, limit: int) -> List[Tuple[str, int, int]]:
+        """(key, count, error), highest count first"""
+        items = heapq.nlargest(limit, self._counts.items(), key=lambda item: item[1][0])
+        return [(key, count, error) for key, (count, error) in items]
+
+    def to_list(self) -> List:
+        return [[key, count, error] for key, (count, error) in self._counts.items()]
+
+    @classmethod
+    def merged(cls, capacity: int, summaries: Iterable[Tuple[int, List]]) -> "SpaceSaving":
+        """Sum (total, to_list()) summaries per key, keeping the capacity largest"""
+        total, counts = 0, {}
+        for summary_total, items in summaries:
+            total += summary_total
+            for key, count, error in items:
+                entry = counts.setdefault(key, [0, 0])
+                entry[0] += count
+                entry[1] += error
+
+        summary = cls(capacity)
+        for key, entry in heapq.nlargest(summary.capacity, counts.items(), key=lambda item: item[1][0]):
+            summary._counts[key] = entry
+        summary._heap = [(entry[0], key) for key, entry in summary._counts.items()]
+        heapq.heapify(summary._heap)
+        summary.total = total
+        return summary
+
+class HeavyHitters:
+    def __init__(self, capacity: int = 1000, window_capacity: int = 200, window: int = 3600,
+                 slice_seconds: int = 300, checkpoint_interval: float = 60.0):
+        self.capacity = capacity
+        self.window_capacity = window_capacity
+        self.window = window
+        self.slice_seconds = max(slice_seconds, 1)
+        self.checkpoint_interval = checkpoint_interval
+        self.node = node_id()
+
+        self.all_time = SpaceSaving(capacity)
+        # slice start (epoch seconds) -> views in that slice
+        self._slices: Dict[int, SpaceSaving] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._stopping: Optional[asyncio.Event] = None
+
+        self.recorded = 0
+        self.checkpoints = 0
+        self.claimed = 0
+        self.errors = 0
+        self.last_checkpoint_at: Optional[float] = None
+
+    def _slice(self, start: int) -> SpaceSaving:
+        summary = self._slices.get(start)
+        if summary is None:
+            summary = self._slices[start] = SpaceSaving(self.window_capacity)
+            horizon = time.time() - self.window
+            for expired in [s for s in self._slices if s + self.slice_seconds <= horizon]:
+                del self._slices[expired]
+        return summary
+
+    def record(self, content_hash: str, views: int = 1):
+        """Count views of a verification as they happen"""
+        self.all_time.add(content_hash, views)
+        self._slice(int(time.time() // self.slice_seconds * self.slice_seconds)).add(content_hash, views)
+        self.recorded += views
+
+    def _checkpoint_data(self) -> Dict:
+        return {
+            "total": self.all_time.total,
+            "items": self.all_time.to_list(),
+            "slices": [[start, summary.total, summary.to_list()] for start, summary in sorted(self._slices.items())]
+        }
+
+    def _absorb(self, data: Dict):
+        """Fold a claimed checkpoint into this node's summaries"""
+        self.all_time = SpaceSaving.merged(self.capacity, [
+            (self.all_time.total, self.all_time.to_list()), (data["total"], data["items"])
+        ])
+        horizon = time.time() - self.window
+        for start, total, items in data["slices"]:
+            if start + self.slice_seconds <= horizon:
+                continue
+            current = self._slice(start)
+            self._slices[start] = SpaceSaving.merged(
+                self.window_capacity, [(current.total, current.to_list()), (total, items)]
+            )
+
+    async def start(self):
+        if self._task is None:
+            self._stopping = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            # Let a checkpoint in progress finish: cancelling it after a claim
+            # committed would lose the claimed summaries
+            self._stopping.set()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.checkpoint()
+
+    async def _run(self):
+        while not self._stopping.is_set():
+            await self.checkpoint()
+            try:
+                await asyncio.wait_for(self._stopping.wait(), self.checkpoint_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def checkpoint(self):
+        """Claim abandoned checkpoints, then write ours"""
+        table = HeavyHitterCheckpoint.__table__
+        try:
+            # Other nodes checkpoint every interval; three missed means gone
+            cutoff = datetime.utcnow() - timedelta(seconds=3 * self.checkpoint_interval)
+            async with engine.begin() as conn:
+                abandoned = await conn.execute(
+                    delete(table)
+                    .where(table.c.node != self.node, table.c.updated_at < cutoff)
+                    .returning(table.c.data)
+                )
+                claimed = abandoned.scalars().all()
+            # Only once the delete has committed, so a rollback cannot double count
+            for data in claimed:
+                self._absorb(json.loads(data))
+                self.claimed += 1
+
+            stmt = dialect_insert(table).values(
+                node=self.node, data=json.dumps(self._checkpoint_data()), updated_at=datetime.utcnow()
+            )
+            stmt = stmt.on_conflict_do_update(
+                index_elements=['node'],
+                set_={'data': stmt.excluded.data, 'updated_at': stmt.excluded.updated_at}
+            )
+            async with engine.begin() as conn:
+                await conn.execute(stmt)
+        except Exception as e:
+            print(f"Heavy hitters checkpoint error: {e}")
+            self.errors += 1
+            return
+        self.checkpoints += 1
+        self.last_checkpoint_at = time.time()
+
+    async def top(self, db, limit: int, window: Optional[int] = None) -> List[Tuple[str, int, int]]:
+        """Most viewed (content_hash, views, error) across all nodes, all-time or over the last window seconds"""
+        result = await db.execute(
+            select(HeavyHitterCheckpoint.data).where(HeavyHitterCheckpoint.node != self.node)
+        )
+        checkpoints = [json.loads(data) for data in result.scalars()]
+
+        if window is None:
+            summaries = [(self.all_time.total, self.all_time.to_list())]
+            summaries += [(data["total"], data["items"]) for data in checkpoints]
+            return SpaceSaving.merged(self.capacity, summaries).top(limit)
+
+        horizon = time.time() - window
+        summaries = [
+            (summary.total, summary.to_list()) for start, summary in self._slices.items()
+            if start + self.slice_seconds > horizon
+        ]
+        summaries += [
+            (total, items) for data in checkpoints for start, total, items in data["slices"]
+            if start + self.slice_seconds > horizon
+        ]
+        return SpaceSaving.merged(self.window_capacity, summaries).top(limit)
+
+    def stats(self) -> Dict:
+        return {
+            'node': self.node,
+            'tracked': len(self.all_time),
+            'capacity': self.capacity,
+            'total_views': self.all_time.total,
+            'window_s': self.window,
+            'slices': len(self._slices),
+            'recorded': self.recorded,
+            'checkpoints': self.checkpoints,
+            'claimed': self.claimed,
+            'errors': self.errors,
+            'last_checkpoint_age_s': round(time.time() - self.last_checkpoint_at, 1) if self.last_checkpoint_at else None
+        }
+
+heavy_hitters = HeavyHitters(
+    capacity=settings.HEAVY_HITTERS_CAPACITY,
+    window_capacity=settings.HEAVY_HITTERS_WINDOW_CAPACITY,
+    window=settings.HEAVY_HITTERS_WINDOW_S,
+    slice_seconds=settings.HEAVY_HITTERS_SLICE_S,
+    checkpoint_interval=settings.HEAVY_HITTERS_CHECKPOINT_S
+)
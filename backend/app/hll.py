@@ -0,0 +1,92 @@
+"""
+HyperLogLog distinct counter
+
+Estimates how many distinct keys were added using 2^precision one-byte
+registers (16 KB at the default precision 14). The relative standard error
+is 1.04 / sqrt(2^precision), about 0.81% at precision 14, so roughly 95% of
+estimates fall within 1.6% of the true count; small counts use linear
+counting and are close to exact.
+
+Sketches merge by taking the register-wise maximum, so per-hour or per-node
+sketches combine into the sketch of their union without revisiting any key.
+"""
+import math
+import zlib
+import hashlib
+from typing import Iterable
+import numpy as np
+
+DEFAULT_PRECISION = 14
+
+def _key_bits(key: str) -> int:
+    """64 uniform bits for key (content hashes are already SHA-256 hex)"""
+    try:
+        digest = bytes.fromhex(key) if len(key) == 64 else None
+    except ValueError:
+        digest = None
+    if digest is None:
+        digest = hashlib.sha256(key.encode()).digest()
+    return int.from_bytes(digest[:8], 'big')
+
+class HyperLogLog:
+    def __init__(self, precision: int = DEFAULT_PRECISION):
+        if not 4 <= precision <= 18:
+            raise ValueError("HyperLogLog precision must be between 4 and 18")
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    @property
+    def error(self) -> float:
+        """Relative standard error of count()"""
+        return 1.04 / math.sqrt(len(self.registers))
+
+    def add(self, key: str):
+        self.add_many([key])
+
+    def add_many(self, keys: Iterable[str]):
+        bits = np.array([_key_bits(key) for key in keys], dtype=np.uint64)
+        if not len(bits):
+            return
+        width = 64 - self.precision
+        index = (bits >> np.uint64(width)).astype(np.int64)
+        rest = bits & np.uint64((1 << width) - 1)
+        # Rank = leading zeros in the remaining bits + 1
+        length = np.zeros(len(rest), dtype=np.int64)
+        nonzero = rest > 0
+        length[nonzero] = np.floor(np.log2(rest[nonzero].astype(np.float64))).astype(np.int64) + 1
+        np.maximum.at(self.registers, index, (width - length + 1).astype(np.uint8))
+
+    def merge(self, other: "HyperLogLog") -> "HyperLogLog":
+        """Fold other into this sketch (same precision)"""
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge HyperLogLog sketches of different precision")
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def copy(self) -> "HyperLogLog":
+        sketch = HyperLogLog(self.precision)
+        sketch.registers[:] = self.registers
+        return sketch
+
+    def count(self) -> int:
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / float(np.sum(np.ldexp(1.0, -self.registers.astype(np.int64))))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and zeros > 0:
+            # Small range: linear counting
+            estimate = m * math.log(m / zeros)
+        return int(round(estimate))
+
+    def to_bytes(self) -> bytes:
+        """Precision byte + zlib-compressed registers (sparse sketches shrink to a few hundred bytes)"""
+        return bytes([self.precision]) + zlib.compress(self.registers.tobytes())
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "HyperLogLog":
+        sketch = cls(data[0])
+        registers = np.frombuffer(zlib.decompress(data[1:]), dtype=np.uint8)
+        if len(registers) != len(sketch.registers):
+            raise ValueError("Corrupt HyperLogLog sketch")
+        sketch.registers[:] = registers
+        return sketch
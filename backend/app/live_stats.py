@@ -0,0 +1,169 @@
+"""
+Live stats stream (Server-Sent Events)
+
+The scan write-behind buffer publishes every flushed batch here once it has
+committed. The hub turns each batch into one delta event (scans by
+classification and platform plus the newest scans), encodes it once and
+keeps the last LIVE_STATS_HISTORY events, which every subscriber reads:
+
+    event: snapshot   full /stats response, sent first (and after a gap)
+    event: scans      delta to add to the snapshot
+    : heartbeat       comment sent every LIVE_STATS_HEARTBEAT_S when idle
+
+Event ids are "<epoch>-<seq>". A client reconnecting with Last-Event-ID
+resumes from the buffer; if its cursor is from another process or older than
+the buffer, it gets a fresh snapshot instead. Each worker publishes only the
+scans it wrote, so with several workers a stream shows that worker's share of
+the deltas until its next snapshot.
+"""
+import json
+import time
+import asyncio
+from collections import deque
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, Iterable, Optional, Tuple
+from app.config import settings
+
+RECENT_SCANS = 10
+RETRY_MS = 3000  # client reconnect delay
+AI_CLASSES = ("ai", "bot")
+
+def _frame(event: str, event_id: str, data: Dict[str, Any]) -> str:
+    return f"id: {event_id}\nevent: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+def _recent(scan: Dict) -> Dict:
+    """Same shape as /stats recent_scans"""
+    preview = scan.get("content_preview")
+    return {
+        "id": str(scan["id"]),
+        "classification": scan["classification"].value,
+        "ai_probability": scan["ai_probability"],
+        "platform": scan.get("source_platform"),
+        "preview": preview[:50] if preview else None,
+        "created_at": scan["created_at"].isoformat()
+    }
+
+class LiveStatsHub:
+    def __init__(self, history: int = 1000, heartbeat: float = 15.0):
+        self.heartbeat = heartbeat
+        self.epoch = int(time.time() * 1000)
+
+        # (seq, monotonic time published, encoded frame)
+        self._events: Deque[Tuple[int, float, str]] = deque(maxlen=history)
+        self._seq = 0
+        self._wakeup = asyncio.Event()
+
+        self.published = 0
+        self.subscribers = 0
+        self.snapshots = 0
+        self.resumed = 0
+
+    def _event_id(self, seq: int) -> str:
+        return f"{self.epoch}-{seq}"
+
+    def publish_scans(self, scans: Iterable[Dict]):
+        """Broadcast one committed batch of ContentScan rows (column dicts)"""
+        scans = list(scans)
+        if not scans:
+            return
+
+        by_classification: Dict[str, int] = {}
+        platforms: Dict[str, Dict[str, int]] = {}
+        for scan in scans:
+            classification = scan["classification"].value
+            by_classification[classification] = by_classification.get(classification, 0) + 1
+            stats = platforms.setdefault(scan.get("source_platform") or "unknown", {"total": 0, "ai_count": 0})
+            stats["total"] += 1
+            if classification in AI_CLASSES:
+                stats["ai_count"] += 1
+
+        newest = sorted(scans, key=lambda scan: scan["created_at"], reverse=True)[:RECENT_SCANS]
+        self._seq += 1
+        self._events.append((self._seq, time.monotonic(), _frame("scans", self._event_id(self._seq), {
+            "scans": len(scans),
+            "by_classification": by_classification,
+            "platforms": platforms,
+            "recent_scans": [_recent(scan) for scan in newest]
+        })))
+        self.published += 1
+
+        # Wake every waiting subscriber at once
+        self._wakeup.set()
+        self._wakeup = asyncio.Event()
+
+    def _resume_point(self, last_event_id: Optional[str]) -> Optional[int]:
+        """Sequence number to continue after, or None if a snapshot is needed"""
+        if not last_event_id:
+            return None
+        epoch, _, seq = last_event_id.partition("-")
+        if epoch != str(self.epoch) or not seq.isdigit():
+            return None
+        seq = int(seq)
+        if seq > self._seq or (self._events and self._events[0][0] > seq + 1):
+            return None
+        return seq
+
+    def _seq_at(self, age: float) -> int:
+        """Last event published at least age seconds ago (already in a snapshot that old)"""
+        cutoff = time.monotonic() - age
+        seq = self._events[0][0] - 1 if self._events else self._seq
+        for event_seq, published_at, _ in self._events:
+            if published_at > cutoff:
+                break
+            seq = event_seq
+        return seq
+
+    async def _snapshot(self, snapshot: Callable[[], Awaitable[Tuple[Dict, float]]]) -> Tuple[int, str]:
+        data, age = await snapshot()
+        # Deltas published after the snapshot was computed follow it
+        seq = self._seq_at(age)
+        self.snapshots += 1
+        return seq, _frame("snapshot", self._event_id(seq), data)
+
+    async def stream(self, last_event_id: Optional[str],
+                     snapshot: Callable[[], Awaitable[Tuple[Dict, float]]]) -> AsyncIterator[str]:
+        """SSE frames for one subscriber; snapshot() returns (stats, age in seconds)"""
+        self.subscribers += 1
+        try:
+            yield f"retry: {RETRY_MS}\n\n"
+
+            seq = self._resume_point(last_event_id)
+            if seq is None:
+                seq, frame = await self._snapshot(snapshot)
+                yield frame
+            else:
+                self.resumed += 1
+
+            while True:
+                if self._events and self._events[0][0] > seq + 1:
+                    # Fell behind the buffer: start over from a snapshot
+                    seq, frame = await self._snapshot(snapshot)
+                    yield frame
+
+                frames = [(event_seq, frame) for event_seq, _, frame in self._events if event_seq > seq]
+                if frames:
+                    seq = frames[-1][0]
+                    yield "".join(frame for _, frame in frames)
+                    continue
+
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.heartbeat)
+                except asyncio.TimeoutError:
+                    yield ": heartbeat\n\n"
+        finally:
+            self.subscribers -= 1
+
+    def stats(self) -> Dict:
+        return {
+            'subscribers': self.subscribers,
+            'published': self.published,
+            'buffered': len(self._events),
+            'last_event_id': self._event_id(self._seq),
+            'snapshots': self.snapshots,
+            'resumed': self.resumed,
+            'heartbeat_s': self.heartbeat
+        }
+
+live_stats = LiveStatsHub(
+    history=settings.LIVE_STATS_HISTORY,
+    heartbeat=settings.LIVE_STATS_HEARTBEAT_S
+)
@@ -4,12 +4,23 @@ from contextlib import asynccontextmanager
 import logging
 
 from app.config import settings
-from app.database import init_db
+from app.database import init_db, pool_metrics
 from app.routes import detect_router, stats_router, attention_router
-from app.routes.factcheck import router as factcheck_router
-from app.routes.companion import router as companion_router
+from app.routes.factcheck import router as factcheck_router, fact_checker
+from app.routes.companion import router as companion_router, companion
 from app.routes.impressions import router as impressions_router
 from app.routes.verify import router as verify_router
+from app.detection.claim_cache import claim_cache
+from app.detection.governor import governor
+from app.detection.text import text_detector
+from app.scan_buffer import scan_buffer
+from app.view_counter import view_counts
+from app.verification_filter import verification_filter
+from app.verification_snapshot import snapshots
+from app.stats_cache import stats_cache
+from app.live_stats import live_stats
+from app.content_sketches import content_sketches
+from app.heavy_hitters import heavy_hitters
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -19,8 +30,18 @@ async def lifespan(app: FastAPI):
     logger.info("Starting PoC MVP API...")
     await init_db()
     logger.info("Database initialized")
+    await content_sketches.start()
+    await scan_buffer.start()
+    await view_counts.start()
+    await verification_filter.start()
+    await heavy_hitters.start()
     yield
     logger.info("Shutting down...")
+    await heavy_hitters.stop()
+    await verification_filter.stop()
+    await view_counts.stop()
+    await scan_buffer.stop()
+    await content_sketches.stop()
 
 app = FastAPI(
     title="PoC MVP API",
@@ -58,3 +79,25 @@ async def root():
 @app.get("/health")
 async def health():
     return {"status": "healthy"}
+
+@app.get("/metrics")
+async def metrics():
+    return {
+        "db_pool": pool_metrics.stats(),
+        "outbound": governor.stats(),
+        "scan_buffer": scan_buffer.stats(),
+        "view_counts": view_counts.stats(),
+        "verification_filter": verification_filter.stats(),
+        "snapshots": snapshots.stats(),
+        "stats_cache": stats_cache.stats(),
+        "live_stats": live_stats.stats(),
+        "content_sketches": content_sketches.stats(),
+        "heavy_hitters": heavy_hitters.stats(),
+        "single_flight": {
+            "text_detection": text_detector.in_flight.stats(),
+            "fact_check": fact_checker.in_flight.stats()
+        },
+        "claim_cache": claim_cache.stats(),
+        "companion": companion.stats(),
+        "claim_knowledge_base": fact_checker.knowledge_base.stats() if fact_checker.knowledge_base else None
+    }
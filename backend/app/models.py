@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Float, Boolean, DateTime, Integer, Text, Enum as SQLEnum
+from sqlalchemy import Column, String, Float, Boolean, DateTime, Integer, Text, LargeBinary, Enum as SQLEnum, UniqueConstraint
 from sqlalchemy.dialects.postgresql import UUID
 from datetime import datetime
 import uuid
@@ -114,3 +114,81 @@ class Verification(Base):
 
     # Detailed scores (JSON string)
     scores = Column(Text, nullable=True)
+
+class ClaimVerdict(Base):
+    """Cached fact-check verdicts keyed by normalized claim digest"""
+    __tablename__ = "claim_verdicts"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    claim_hash = Column(String(64), unique=True, index=True, nullable=False)
+    claim = Column(Text, nullable=False)
+
+    verdict = Column(String(20), nullable=False)
+    confidence = Column(Float, nullable=False)
+    explanation = Column(Text, nullable=True)
+    sources = Column(Text, nullable=True)  # JSON list
+
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+class ScanRollup(Base):
+    """Scan counts per hour/day bucket, platform, classification and content type
+
+    Maintained incrementally as content_scans rows are written (app.rollups).
+    """
+    __tablename__ = "scan_rollups"
+    __table_args__ = (
+        UniqueConstraint("granularity", "bucket", "source_platform", "classification", "content_type"),
+    )
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    granularity = Column(String(8), nullable=False)  # hour, day
+    bucket = Column(DateTime, nullable=False, index=True)  # start of the hour/day
+    source_platform = Column(String(50), nullable=False)  # "unknown" when not set
+    classification = Column(SQLEnum(Classification), nullable=False)
+    content_type = Column(SQLEnum(ContentType), nullable=False)
+
+    scan_count = Column(Integer, nullable=False, default=0)
+
+class VerificationRollup(Base):
+    """New verifications and views per hour/day bucket and classification"""
+    __tablename__ = "verification_rollups"
+    __table_args__ = (
+        UniqueConstraint("granularity", "bucket", "classification"),
+    )
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    granularity = Column(String(8), nullable=False)
+    bucket = Column(DateTime, nullable=False, index=True)
+    classification = Column(SQLEnum(Classification), nullable=False)
+
+    verification_count = Column(Integer, nullable=False, default=0)
+    view_count = Column(Integer, nullable=False, default=0)
+
+class ContentSketch(Base):
+    """HyperLogLog sketch of content hashes scanned per hour, platform and classification
+
+    Each API process (node) writes its own rows; readers merge them (app.content_sketches).
+    """
+    __tablename__ = "content_sketches"
+    __table_args__ = (
+        UniqueConstraint("node", "bucket", "source_platform", "classification"),
+    )
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    node = Column(String(100), nullable=False)  # host-pid, or "backfill"
+    bucket = Column(DateTime, nullable=False, index=True)  # start of the hour
+    source_platform = Column(String(50), nullable=False)
+    classification = Column(SQLEnum(Classification), nullable=False)
+
+    sketch = Column(LargeBinary, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+class HeavyHitterCheckpoint(Base):
+    """Latest top-K view summaries of one API process (app.heavy_hitters)"""
+    __tablename__ = "heavy_hitter_checkpoints"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    node = Column(String(100), unique=True, nullable=False)  # host-pid, or "backfill"
+    data = Column(Text, nullable=False)  # JSON: all-time and per-slice summaries
+    updated_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
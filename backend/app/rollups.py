@@ -0,0 +1,136 @@
+"""
+Hourly and daily rollups behind the stats endpoints
+
+Raw tables grow without bound, so the stats endpoints read these instead:
+- scan_rollups: scans per bucket, platform, classification and content type,
+  incremented in the same transaction as each write-behind flush
+- verification_rollups: new verifications and views per bucket and
+  classification, incremented with verification upserts and view-count flushes
+
+Increments are pre-aggregated per flush and applied as one multi-row
+INSERT ... ON CONFLICT DO UPDATE. backfill_rollups.py rebuilds both tables
+from the raw data.
+"""
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import select, func
+from app.database import dialect_insert
+from app.models import ScanRollup, VerificationRollup, Classification
+
+GRANULARITIES = {
+    "hour": timedelta(hours=1),
+    "day": timedelta(days=1),
+}
+
+def bucket_start(moment: datetime, granularity: str) -> datetime:
+    if granularity == "hour":
+        return moment.replace(minute=0, second=0, microsecond=0)
+    return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+
+def bucket_expression(dialect: str, column, granularity: str):
+    """SQL truncating column to the bucket start (for backfills)"""
+    if dialect == "postgresql":
+        return func.date_trunc(granularity, column)
+    pattern = "%Y-%m-%d %H:00:00" if granularity == "hour" else "%Y-%m-%d 00:00:00"
+    return func.strftime(pattern, column)
+
+async def _increment(executor, model, keys: List[str], rows: Dict[Tuple, Dict[str, int]]):
+    if not rows:
+        return
+    values = [
+        {**dict(zip(keys, key)), **counts}
+        # Same key order in every writer, so concurrent upserts cannot deadlock
+        for key, counts in sorted(rows.items(), key=lambda item: str(item[0]))
+    ]
+    table = model.__table__
+    stmt = dialect_insert(table).values(values)
+    counters = [column for column in values[0] if column not in keys]
+    stmt = stmt.on_conflict_do_update(
+        index_elements=keys,
+        set_={column: table.c[column] + stmt.excluded[column] for column in counters}
+    )
+    await executor.execute(stmt)
+
+async def increment_scan_rollups(executor, scans: Iterable[Dict]):
+    """Count content_scans rows (column dicts) into the scan rollups"""
+    keys = ["granularity", "bucket", "source_platform", "classification", "content_type"]
+    rows: Dict[Tuple, Dict[str, int]] = {}
+    for scan in scans:
+        for granularity in GRANULARITIES:
+            key = (
+                granularity,
+                bucket_start(scan["created_at"], granularity),
+                scan["source_platform"] or "unknown",
+                scan["classification"],
+                scan["content_type"],
+            )
+            counts = rows.setdefault(key, {"scan_count": 0})
+            counts["scan_count"] += 1
+    await _increment(executor, ScanRollup, keys, rows)
+
+async def increment_verification_rollups(executor, events: Iterable[Tuple[datetime, Classification, int, int]]):
+    """Apply (when, classification, new verifications, views) events"""
+    keys = ["granularity", "bucket", "classification"]
+    rows: Dict[Tuple, Dict[str, int]] = {}
+    for moment, classification, verifications, views in events:
+        for granularity in GRANULARITIES:
+            key = (granularity, bucket_start(moment, granularity), classification)
+            counts = rows.setdefault(key, {"verification_count": 0, "view_count": 0})
+            counts["verification_count"] += verifications
+            counts["view_count"] += views
+    await _increment(executor, VerificationRollup, keys, rows)
+
+async def scan_totals(db) -> List[Tuple[str, Classification, int]]:
+    """All-time (platform, classification, scans) from the daily rollups"""
+    result = await db.execute(
+        select(
+            ScanRollup.source_platform,
+            ScanRollup.classification,
+            func.sum(ScanRollup.scan_count)
+        )
+        .where(ScanRollup.granularity == "day")
+        .group_by(ScanRollup.source_platform, ScanRollup.classification)
+    )
+    return [(platform, classification, int(count)) for platform, classification, count in result]
+
+async def recent_scan_counts(db, windows: Dict[str, timedelta],
+                             now: Optional[datetime] = None) -> Dict[str, Dict[Classification, float]]:
+    """Scans per classification over each trailing window, from hourly rollups
+
+    The oldest hour of a window only partly overlaps it; its count is
+    prorated by the overlap (assumes scans spread evenly within the hour).
+    """
+    now = now or datetime.utcnow()
+    oldest = bucket_start(now - max(windows.values()), "hour")
+    result = await db.execute(
+        select(ScanRollup.bucket, ScanRollup.classification, func.sum(ScanRollup.scan_count))
+        .where(ScanRollup.granularity == "hour", ScanRollup.bucket >= oldest)
+        .group_by(ScanRollup.bucket, ScanRollup.classification)
+    )
+    hourly = result.all()
+
+    counts = {}
+    for name, window in windows.items():
+        since = now - window
+        totals = {c: 0.0 for c in Classification}
+        for bucket, classification, count in hourly:
+            end = bucket + GRANULARITIES["hour"]
+            if end <= since:
+                continue
+            overlap = min((end - since) / GRANULARITIES["hour"], 1.0)
+            totals[classification] += int(count) * overlap
+        counts[name] = totals
+    return counts
+
+async def verification_totals(db) -> Dict[Classification, Tuple[int, int]]:
+    """All-time classification -> (verifications, views) from the daily rollups"""
+    result = await db.execute(
+        select(
+            VerificationRollup.classification,
+            func.sum(VerificationRollup.verification_count),
+            func.sum(VerificationRollup.view_count)
+        )
+        .where(VerificationRollup.granularity == "day")
+        .group_by(VerificationRollup.classification)
+    )
+    return {classification: (int(count), int(views)) for classification, count, views in result}
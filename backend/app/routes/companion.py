@@ -11,6 +11,7 @@ class CompanionRequest(BaseModel):
     url: str = ""
     page_title: str = ""
     page_text: str = ""
+    session_id: Optional[str] = None  # Enables screen dedupe and debounce per tab
 
 class CompanionReactionRequest(BaseModel):
     content_type: str
@@ -22,6 +23,7 @@ class CompanionResponse(BaseModel):
     tone: str
     confidence: float
     emoji: str
+    reused: bool = False  # Same comment as last time; clients can skip showing it again
 
 @router.post("/comment", response_model=CompanionResponse)
 async def get_companion_comment(request: CompanionRequest):
@@ -34,7 +36,8 @@ async def get_companion_comment(request: CompanionRequest):
             screenshot_base64=request.screenshot,
             url=request.url,
             page_title=request.page_title,
-            page_text=request.page_text
+            page_text=request.page_text,
+            session_id=request.session_id
         )
 
         # Map tone to emoji
@@ -50,7 +53,8 @@ async def get_companion_comment(request: CompanionRequest):
             message=result.message,
             tone=result.tone,
             confidence=result.confidence,
-            emoji=tone_emoji.get(result.tone, '💬')
+            emoji=tone_emoji.get(result.tone, '💬'),
+            reused=result.reused
         )
 
     except Exception as e:
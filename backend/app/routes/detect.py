@@ -2,11 +2,14 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from typing import List
+import asyncio
 import json
 import uuid
 
+from app.config import settings
 from app.database import get_db
 from app.models import ContentScan, ContentType, Classification
+from app.scan_buffer import scan_buffer
 from app.schemas import (
     DetectRequest, DetectResponse, DetectionScores,
     BatchDetectRequest, BatchDetectResponse,
@@ -16,56 +19,50 @@ from app.detection import text_detector, image_detector
 
 router = APIRouter(prefix="/detect", tags=["Detection"])
 
-@router.post("", response_model=DetectResponse)
-async def detect_content(
-    request: DetectRequest,
-    db: AsyncSession = Depends(get_db)
-):
-    """Detect if content is AI-generated"""
-    
-    # Route to appropriate detector
+# Map classification
+CLASS_MAP = {
+    "HUMAN": Classification.HUMAN,
+    "LIKELY_HUMAN": Classification.HUMAN,
+    "MIXED": Classification.MIXED,
+    "LIKELY_AI": Classification.AI,
+    "AI": Classification.AI,
+    "UNCERTAIN": Classification.UNCERTAIN
+}
+
+async def _run_detection(request: DetectRequest, interactive: bool = True):
+    """Route to the appropriate detector; returns (result, content type)"""
     if request.content_type == "text" or request.content_type == "tweet":
         result = await text_detector.detect(
             request.content,
-            request.source_platform
+            request.source_platform,
+            interactive=interactive
         )
         content_type = ContentType.TEXT if request.content_type == "text" else ContentType.TWEET
-        
+
     elif request.content_type == "image":
         result = await image_detector.detect(request.content)
         content_type = ContentType.IMAGE
     else:
         raise HTTPException(400, f"Unsupported content type: {request.content_type}")
-    
-    # Map classification
-    class_map = {
-        "HUMAN": Classification.HUMAN,
-        "LIKELY_HUMAN": Classification.HUMAN,
-        "MIXED": Classification.MIXED,
-        "LIKELY_AI": Classification.AI,
-        "AI": Classification.AI,
-        "UNCERTAIN": Classification.UNCERTAIN
-    }
-    
-    # Create database record
-    verification_id = str(uuid.uuid4())
-    
-    scan = ContentScan(
+
+    return result, content_type
+
+def _scan_values(request: DetectRequest, result, content_type: ContentType, verification_id: str) -> dict:
+    """Column values for the ContentScan row of one detection"""
+    return dict(
         id=uuid.UUID(verification_id),
         content_hash=result.content_hash,
         content_type=content_type,
         content_preview=request.content[:200] if request.content_type != "image" else None,
-        classification=class_map.get(result.classification, Classification.UNCERTAIN),
+        classification=CLASS_MAP.get(result.classification, Classification.UNCERTAIN),
         ai_probability=result.ai_probability,
         confidence=result.confidence,
         source_url=request.source_url,
         source_platform=request.source_platform or "web",
         scores=json.dumps(result.scores)
     )
-    
-    db.add(scan)
-    await db.commit()
-    
+
+def _detect_response(request: DetectRequest, result, verification_id: str) -> DetectResponse:
     return DetectResponse(
         success=True,
         verification_id=verification_id,
@@ -77,36 +74,56 @@ async def detect_content(
         content_preview=request.content[:100] if request.content_type != "image" else None
     )
 
+async def _gather_bounded(coros, limit: int):
+    """Run coroutines concurrently, at most limit at a time, in input order"""
+    semaphore = asyncio.Semaphore(max(limit, 1))
+
+    async def run(coro):
+        async with semaphore:
+            return await coro
+
+    return await asyncio.gather(*[run(c) for c in coros], return_exceptions=True)
+
+@router.post("", response_model=DetectResponse)
+async def detect_content(request: DetectRequest):
+    """Detect if content is AI-generated"""
+    
+    result, content_type = await _run_detection(request)
+    
+    # Record the scan (written behind the response)
+    verification_id = str(uuid.uuid4())
+    await scan_buffer.submit(_scan_values(request, result, content_type, verification_id))
+    
+    return _detect_response(request, result, verification_id)
+
 @router.post("/batch", response_model=BatchDetectResponse)
-async def detect_batch(
-    request: BatchDetectRequest,
-    db: AsyncSession = Depends(get_db)
-):
-    """Detect multiple pieces of content"""
+async def detect_batch(request: BatchDetectRequest):
+    """Detect multiple pieces of content
+    
+    Identical items are detected once and detection runs concurrently;
+    every item still gets its own result and scan record.
+    """
+    
+    # Coalesce the detection only; results follow the input items
+    unique = {}
+    for item in request.items:
+        unique.setdefault((item.content, item.content_type, item.source_platform), item)
+    
+    detections = await _gather_bounded(
+        [_run_detection(item, interactive=False) for item in unique.values()],
+        settings.DETECT_BATCH_CONCURRENCY
+    )
+    by_key = dict(zip(unique, detections))
     
     results = []
+    rows = []
     ai_count = 0
     human_count = 0
     
     for item in request.items:
-        # Reuse single detect logic
-        single_request = DetectRequest(
-            content=item.content,
-            content_type=item.content_type,
-            source_url=item.source_url,
-            source_platform=item.source_platform
-        )
+        detection = by_key[(item.content, item.content_type, item.source_platform)]
         
-        try:
-            result = await detect_content(single_request, db)
-            results.append(result)
-            
-            if result.ai_probability >= 0.5:
-                ai_count += 1
-            else:
-                human_count += 1
-                
-        except Exception as e:
+        if isinstance(detection, BaseException):
             # Add failed result
             results.append(DetectResponse(
                 success=False,
@@ -117,6 +134,19 @@ async def detect_batch(
                 confidence=0,
                 scores=DetectionScores()
             ))
+            continue
+        
+        result, content_type = detection
+        verification_id = str(uuid.uuid4())
+        rows.append(_scan_values(item, result, content_type, verification_id))
+        results.append(_detect_response(item, result, verification_id))
+        
+        if result.ai_probability >= 0.5:
+            ai_count += 1
+        else:
+            human_count += 1
+    
+    await scan_buffer.submit_many(rows)
     
     total = len(results)
     
@@ -132,46 +162,41 @@ async def detect_batch(
     )
 
 @router.post("/tweets", response_model=TweetDetectResponse)
-async def detect_tweets(
-    request: TweetDetectRequest,
-    db: AsyncSession = Depends(get_db)
-):
+async def detect_tweets(request: TweetDetectRequest):
     """Detect AI/bot content in tweets"""
     
+    tweets = [tweet for tweet in request.tweets if len(tweet.get('text', '') or '') >= 5]
+    
+    # Identical texts share one detection; every tweet still gets its own result
+    texts = list(dict.fromkeys(tweet['text'] for tweet in tweets))
+    detections = await _gather_bounded(
+        [text_detector.detect(text, 'twitter', interactive=False) for text in texts],
+        settings.DETECT_BATCH_CONCURRENCY
+    )
+    by_text = dict(zip(texts, detections))
+    
     results = []
+    rows = []
     ai_count = 0
     bot_count = 0
     
-    for tweet in request.tweets:
-        text = tweet.get('text', '')
+    for tweet in tweets:
+        text = tweet['text']
         username = tweet.get('username', '')
         tweet_id = tweet.get('tweet_id', '')
+        result = by_text[text]
+        if isinstance(result, BaseException):
+            raise result
         
-        if not text or len(text) < 5:
-            continue
-        
-        # Detect
-        result = await text_detector.detect(text, 'twitter')
         is_bot = text_detector.is_likely_bot(result, tweet)
         
-        # Store in database
-        verification_id = str(uuid.uuid4())
-        
-        class_map = {
-            "HUMAN": Classification.HUMAN,
-            "LIKELY_HUMAN": Classification.HUMAN,
-            "MIXED": Classification.MIXED,
-            "LIKELY_AI": Classification.AI,
-            "AI": Classification.AI,
-            "UNCERTAIN": Classification.UNCERTAIN
-        }
-        
-        scan = ContentScan(
-            id=uuid.UUID(verification_id),
+        # Record the scan
+        rows.append(dict(
+            id=uuid.uuid4(),
             content_hash=result.content_hash,
             content_type=ContentType.TWEET,
             content_preview=text[:200],
-            classification=Classification.BOT if is_bot else class_map.get(result.classification, Classification.UNCERTAIN),
+            classification=Classification.BOT if is_bot else CLASS_MAP.get(result.classification, Classification.UNCERTAIN),
             ai_probability=result.ai_probability,
             confidence=result.confidence,
             source_url=request.source_url,
@@ -179,9 +204,7 @@ async def detect_tweets(
             twitter_username=username,
             twitter_tweet_id=tweet_id,
             scores=json.dumps(result.scores)
-        )
-        
-        db.add(scan)
+        ))
         
         # Track counts
         if result.ai_probability >= 0.5:
@@ -199,7 +222,7 @@ async def detect_tweets(
             is_bot_likely=is_bot
         ))
     
-    await db.commit()
+    await scan_buffer.submit_many(rows)
     
     total = len(results)
     
@@ -1,6 +1,9 @@
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import List, Optional
+import json
+from app.config import settings
 from app.detection.factcheck import FactChecker, FactCheckResult
 
 router = APIRouter(prefix="/api/v1/factcheck", tags=["factcheck"])
@@ -16,6 +19,34 @@ class FactCheckResponse(BaseModel):
     false_count: int
     misleading_count: int
     summary: str
+    partial: bool = False  # True if the time budget ran out before every verdict
+
+def result_to_dict(result: FactCheckResult) -> dict:
+    return {
+        'claim': result.claim,
+        'verdict': result.verdict,
+        'explanation': result.explanation,
+        'sources': result.sources,
+        'confidence': result.confidence,
+        'source': result.source,
+        'deadline_exceeded': result.deadline_exceeded
+    }
+
+def summarize_results(results: List[FactCheckResult]):
+    """Count verdicts and build the user-facing summary line"""
+    false_count = sum(1 for r in results if r.verdict == "FALSE")
+    misleading_count = sum(1 for r in results if r.verdict == "MISLEADING")
+
+    if not results:
+        summary = "No factual claims detected."
+    elif false_count > 0:
+        summary = f"⚠️ Found {false_count} false claim(s). Be cautious!"
+    elif misleading_count > 0:
+        summary = f"🟡 Found {misleading_count} misleading claim(s). Needs context."
+    else:
+        summary = "✓ No obvious false claims detected."
+
+    return false_count, misleading_count, summary
 
 @router.post("/", response_model=FactCheckResponse)
 async def fact_check_text(request: FactCheckRequest):
@@ -28,61 +59,80 @@ async def fact_check_text(request: FactCheckRequest):
     try:
         if request.claims:
             # Check specific claims provided by user
-            results = []
-            for claim in request.claims:
-                result = await fact_checker.check_claim(claim)
-                results.append(result)
+            results = await fact_checker.check_claims(request.claims, settings.FACTCHECK_TIME_BUDGET)
         else:
             # Auto-extract and check claims from text
-            results = await fact_checker.check_text(request.text)
-
-        # Count verdicts
-        false_count = sum(1 for r in results if r.verdict == "FALSE")
-        misleading_count = sum(1 for r in results if r.verdict == "MISLEADING")
-
-        # Generate summary
-        if not results:
-            summary = "No factual claims detected."
-        elif false_count > 0:
-            summary = f"⚠️ Found {false_count} false claim(s). Be cautious!"
-        elif misleading_count > 0:
-            summary = f"🟡 Found {misleading_count} misleading claim(s). Needs context."
-        else:
-            summary = "✓ No obvious false claims detected."
+            results = await fact_checker.check_text(request.text, settings.FACTCHECK_TIME_BUDGET)
+
+        false_count, misleading_count, summary = summarize_results(results)
 
         return FactCheckResponse(
-            results=[{
-                'claim': r.claim,
-                'verdict': r.verdict,
-                'explanation': r.explanation,
-                'sources': r.sources,
-                'confidence': r.confidence
-            } for r in results],
+            results=[result_to_dict(r) for r in results],
             total_claims=len(results),
             false_count=false_count,
             misleading_count=misleading_count,
-            summary=summary
+            summary=summary,
+            partial=any(r.deadline_exceeded for r in results)
         )
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Fact-check failed: {str(e)}")
 
 
+@router.post("/stream")
+async def fact_check_stream(request: FactCheckRequest):
+    """
+    Streaming fact-check (NDJSON, one event per line)
+    - "claims": the claims that will be checked, sent immediately
+    - "result": one verdict per claim, as each resolves
+    - "summary": same counts and summary as the non-streaming endpoint
+    """
+    if request.claims:
+        claims = [{'claim': claim} for claim in request.claims]
+    else:
+        claims = [{
+            'claim': c.text,
+            'start_pos': c.start_pos,
+            'end_pos': c.end_pos,
+            'confidence': c.confidence
+        } for c in fact_checker.extract_claims(request.text)]
+
+    async def events():
+        yield json.dumps({'type': 'claims', 'claims': claims}) + "\n"
+
+        results = []
+        try:
+            async for index, result in fact_checker.iter_check_claims(
+                [c['claim'] for c in claims], settings.FACTCHECK_TIME_BUDGET
+            ):
+                results.append(result)
+                yield json.dumps({'type': 'result', 'index': index, **result_to_dict(result)}) + "\n"
+        except Exception as e:
+            yield json.dumps({'type': 'error', 'detail': f"Fact-check failed: {str(e)}"}) + "\n"
+            return
+
+        false_count, misleading_count, summary = summarize_results(results)
+        yield json.dumps({
+            'type': 'summary',
+            'total_claims': len(results),
+            'false_count': false_count,
+            'misleading_count': misleading_count,
+            'summary': summary,
+            'partial': any(r.deadline_exceeded for r in results)
+        }) + "\n"
+
+    return StreamingResponse(events(), media_type="application/x-ndjson")
+
+
 @router.post("/claim", response_model=dict)
 async def fact_check_claim(claim: str):
     """
     Fact-check a single claim
     """
     try:
-        result = await fact_checker.check_claim(claim)
-
-        return {
-            'claim': result.claim,
-            'verdict': result.verdict,
-            'explanation': result.explanation,
-            'sources': result.sources,
-            'confidence': result.confidence
-        }
+        results = await fact_checker.check_claims([claim], settings.FACTCHECK_TIME_BUDGET)
+
+        return result_to_dict(results[0])
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Claim check failed: {str(e)}")
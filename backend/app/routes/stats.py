@@ -1,69 +1,51 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_
+from sqlalchemy import select, func
 from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
 
-from app.database import get_db
 from app.models import ContentScan, AttentionRecord, Classification, ContentType
+from app.rollups import scan_totals, recent_scan_counts
 from app.schemas import StatsResponse
+from app.stats_cache import stats_cache
+from app.live_stats import live_stats
+from app.content_sketches import content_sketches
 
 router = APIRouter(prefix="/stats", tags=["Statistics"])
 
+AI_CLASSES = (Classification.AI, Classification.BOT)
+
+async def scan_breakdown(db: AsyncSession) -> Dict[str, Any]:
+    """Scan counts by classification and by platform, from the daily rollups"""
+    total = 0
+    by_classification = {c: 0 for c in Classification}
+    platforms: Dict[str, Dict[str, Any]] = {}
+    for platform, classification, count in await scan_totals(db):
+        total += count
+        by_classification[classification] += count
+        stats = platforms.setdefault(platform, {"total": 0, "ai_count": 0})
+        stats["total"] += count
+        if classification in AI_CLASSES:
+            stats["ai_count"] += count
+
+    for stats in platforms.values():
+        stats["ai_percentage"] = round(stats["ai_count"] / stats["total"] * 100, 1) if stats["total"] > 0 else 0
+
+    return {"total": total, "by_classification": by_classification, "platforms": platforms}
+
 @router.get("", response_model=StatsResponse)
-async def get_stats(db: AsyncSession = Depends(get_db)):
+async def get_stats(response: Response):
     """Get aggregated statistics"""
-    
-    # Total counts
-    total_result = await db.execute(select(func.count(ContentScan.id)))
-    total_scans = total_result.scalar() or 0
-    
-    # Classification counts
-    ai_result = await db.execute(
-        select(func.count(ContentScan.id)).where(ContentScan.classification == Classification.AI)
-    )
-    ai_count = ai_result.scalar() or 0
-    
-    human_result = await db.execute(
-        select(func.count(ContentScan.id)).where(ContentScan.classification == Classification.HUMAN)
-    )
-    human_count = human_result.scalar() or 0
-    
-    mixed_result = await db.execute(
-        select(func.count(ContentScan.id)).where(ContentScan.classification == Classification.MIXED)
-    )
-    mixed_count = mixed_result.scalar() or 0
-    
-    bot_result = await db.execute(
-        select(func.count(ContentScan.id)).where(ContentScan.classification == Classification.BOT)
-    )
-    bot_count = bot_result.scalar() or 0
-    
-    # Platform-specific stats
-    async def get_platform_stats(platform: str):
-        total = await db.execute(
-            select(func.count(ContentScan.id)).where(ContentScan.source_platform == platform)
-        )
-        total_count = total.scalar() or 0
-        
-        ai = await db.execute(
-            select(func.count(ContentScan.id)).where(
-                and_(
-                    ContentScan.source_platform == platform,
-                    ContentScan.classification.in_([Classification.AI, Classification.BOT])
-                )
-            )
-        )
-        ai_count = ai.scalar() or 0
-        
-        return {
-            "total": total_count,
-            "ai_count": ai_count,
-            "ai_percentage": round(ai_count / total_count * 100, 1) if total_count > 0 else 0
-        }
-    
-    twitter_stats = await get_platform_stats('twitter')
-    reddit_stats = await get_platform_stats('reddit')
-    web_stats = await get_platform_stats('web')
+    return await stats_cache.serve("stats", response, _stats)
+
+async def _stats(db: AsyncSession) -> StatsResponse:
+    breakdown = await scan_breakdown(db)
+    total_scans = breakdown["total"]
+    counts = breakdown["by_classification"]
+    platform_stats = breakdown["platforms"]
+    empty_platform = {"total": 0, "ai_count": 0, "ai_percentage": 0}
     
     # Recent scans (last 10)
     recent_result = await db.execute(
@@ -84,26 +66,28 @@ async def get_stats(db: AsyncSession = Depends(get_db)):
     ]
     
     # Attention stats
-    attention_total = await db.execute(select(func.count(AttentionRecord.id)))
-    attention_count = attention_total.scalar() or 0
-    
-    attention_verified = await db.execute(
-        select(func.count(AttentionRecord.id)).where(AttentionRecord.human_verified == True)
+    attention_result = await db.execute(
+        select(
+            func.count(AttentionRecord.id),
+            func.count(AttentionRecord.id).filter(AttentionRecord.human_verified == True)
+        )
     )
-    verified_count = attention_verified.scalar() or 0
+    attention_count, verified_count = attention_result.one()
     
     # Calculate percentages
     total_for_pct = total_scans or 1  # Avoid division by zero
     
     return StatsResponse(
         total_scans=total_scans,
-        ai_percentage=round(ai_count / total_for_pct * 100, 1),
-        human_percentage=round(human_count / total_for_pct * 100, 1),
-        mixed_percentage=round(mixed_count / total_for_pct * 100, 1),
-        bot_percentage=round(bot_count / total_for_pct * 100, 1),
-        twitter_stats=twitter_stats,
-        reddit_stats=reddit_stats,
-        web_stats=web_stats,
+        ai_percentage=round(counts[Classification.AI] / total_for_pct * 100, 1),
+        human_percentage=round(counts[Classification.HUMAN] / total_for_pct * 100, 1),
+        mixed_percentage=round(counts[Classification.MIXED] / total_for_pct * 100, 1),
+        bot_percentage=round(counts[Classification.BOT] / total_for_pct * 100, 1),
+        classification_counts={c.value: count for c, count in counts.items()},
+        twitter_stats=platform_stats.get('twitter', empty_platform),
+        reddit_stats=platform_stats.get('reddit', empty_platform),
+        web_stats=platform_stats.get('web', empty_platform),
+        platform_stats=platform_stats,
         recent_scans=recent_scans,
         attention_stats={
             "total_verifications": attention_count,
@@ -113,28 +97,33 @@ async def get_stats(db: AsyncSession = Depends(get_db)):
         last_updated=datetime.utcnow()
     )
 
+@router.get("/stream")
+async def stream_stats(request: Request, last_event_id: Optional[str] = None):
+    """
+    Live stats as Server-Sent Events (see app.live_stats)
+    A snapshot of /stats, then a delta event per batch of scans written
+    """
+    async def snapshot():
+        stats, age = await stats_cache.fetch("stats", _stats)
+        return jsonable_encoder(stats), age
+
+    cursor = request.headers.get("last-event-id") or last_event_id
+    return StreamingResponse(
+        live_stats.stream(cursor, snapshot),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @router.get("/realtime")
-async def get_realtime_stats(db: AsyncSession = Depends(get_db)):
+async def get_realtime_stats(response: Response):
     """Get stats for last hour (for live dashboard)"""
+    return await stats_cache.serve("realtime", response, _realtime_stats)
 
-    one_hour_ago = datetime.utcnow() - timedelta(hours=1)
-
-    # Scans in last hour
-    result = await db.execute(
-        select(func.count(ContentScan.id)).where(ContentScan.created_at >= one_hour_ago)
-    )
-    recent_count = result.scalar() or 0
-
-    # AI in last hour
-    ai_result = await db.execute(
-        select(func.count(ContentScan.id)).where(
-            and_(
-                ContentScan.created_at >= one_hour_ago,
-                ContentScan.classification.in_([Classification.AI, Classification.BOT])
-            )
-        )
-    )
-    ai_count = ai_result.scalar() or 0
+async def _realtime_stats(db: AsyncSession) -> Dict[str, Any]:
+    # Hourly rollups, oldest hour prorated
+    counts = (await recent_scan_counts(db, {"hour": timedelta(hours=1)}))["hour"]
+    recent_count = round(sum(counts.values()))
+    ai_count = sum(counts[c] for c in AI_CLASSES)
 
     return {
         "scans_last_hour": recent_count,
@@ -143,72 +132,49 @@ async def get_realtime_stats(db: AsyncSession = Depends(get_db)):
     }
 
 @router.get("/admin/global")
-async def get_global_admin_stats(db: AsyncSession = Depends(get_db)):
+async def get_global_admin_stats(response: Response):
     """
     Admin endpoint: Get comprehensive statistics across ALL users
     Use this to track total scans from all 1M+ users
     """
-
-    # Total scans ever (across all users)
-    total_result = await db.execute(select(func.count(ContentScan.id)))
-    total_scans = total_result.scalar() or 0
-
-    # Get unique content hashes (de-duplicated content)
-    unique_result = await db.execute(select(func.count(func.distinct(ContentScan.content_hash))))
-    unique_content = unique_result.scalar() or 0
-
-    # Breakdown by classification
-    ai_result = await db.execute(
-        select(func.count(ContentScan.id)).where(ContentScan.classification == Classification.AI)
+    return await stats_cache.serve("admin_global", response, _global_admin_stats)
+
+async def _global_admin_stats(db: AsyncSession) -> Dict[str, Any]:
+    now = datetime.utcnow()
+
+    # Time windows from the hourly rollups
+    windows = await recent_scan_counts(db, {
+        "hour": timedelta(hours=1),
+        "day": timedelta(hours=24),
+        "week": timedelta(hours=168),  # 7 days
+    }, now=now)
+    scans_last_hour, scans_last_24h, scans_last_week = (
+        round(sum(windows[name].values())) for name in ("hour", "day", "week")
     )
-    ai_count = ai_result.scalar() or 0
 
-    human_result = await db.execute(
-        select(func.count(ContentScan.id)).where(ContentScan.classification == Classification.HUMAN)
-    )
-    human_count = human_result.scalar() or 0
-
-    bot_result = await db.execute(
-        select(func.count(ContentScan.id)).where(ContentScan.classification == Classification.BOT)
-    )
-    bot_count = bot_result.scalar() or 0
-
-    # Scans by time period
-    async def get_time_period_count(hours_ago: int):
-        cutoff = datetime.utcnow() - timedelta(hours=hours_ago)
-        result = await db.execute(
-            select(func.count(ContentScan.id)).where(ContentScan.created_at >= cutoff)
-        )
-        return result.scalar() or 0
-
-    scans_last_hour = await get_time_period_count(1)
-    scans_last_24h = await get_time_period_count(24)
-    scans_last_week = await get_time_period_count(168)  # 7 days
-
-    # Platform breakdown
-    platform_result = await db.execute(
-        select(
-            ContentScan.source_platform,
-            func.count(ContentScan.id).label('count')
-        ).group_by(ContentScan.source_platform)
-    )
-    platform_breakdown = {row[0]: row[1] for row in platform_result}
-
-    # Get first and last scan timestamps
-    first_scan_result = await db.execute(
-        select(ContentScan.created_at).order_by(ContentScan.created_at.asc()).limit(1)
-    )
-    first_scan = first_scan_result.scalar()
-
-    last_scan_result = await db.execute(
-        select(ContentScan.created_at).order_by(ContentScan.created_at.desc()).limit(1)
-    )
-    last_scan = last_scan_result.scalar()
+    # De-duplicated content (HyperLogLog estimate)
+    unique_content = await content_sketches.unique(db)
+    unique_last_24h = await content_sketches.unique(db, since=now - timedelta(hours=24))
+
+    # First/last scan: one index probe each
+    first_scan = (await db.execute(select(func.min(ContentScan.created_at)))).scalar()
+    last_scan = (await db.execute(select(func.max(ContentScan.created_at)))).scalar()
+
+    # Breakdown by classification and platform
+    breakdown = await scan_breakdown(db)
+    total_scans = breakdown["total"]
+    ai_count = breakdown["by_classification"][Classification.AI]
+    human_count = breakdown["by_classification"][Classification.HUMAN]
+    bot_count = breakdown["by_classification"][Classification.BOT]
+    platform_breakdown = {
+        platform: stats["total"] for platform, stats in breakdown["platforms"].items()
+    }
 
     return {
         "global_stats": {
             "total_scans": total_scans,
             "unique_content_analyzed": unique_content,
+            "unique_content_error_pct": round(content_sketches.error * 100, 2),  # standard error
             "ai_detected": ai_count,
             "human_detected": human_count,
             "bots_detected": bot_count,
@@ -218,6 +184,7 @@ async def get_global_admin_stats(db: AsyncSession = Depends(get_db)):
             "last_hour": scans_last_hour,
             "last_24_hours": scans_last_24h,
             "last_7_days": scans_last_week,
+            "unique_content_last_24_hours": unique_last_24h,  # from the start of that hour
             "average_per_hour_24h": round(scans_last_24h / 24, 1) if scans_last_24h > 0 else 0,
             "average_per_day_7d": round(scans_last_week / 7, 1) if scans_last_week > 0 else 0
         },
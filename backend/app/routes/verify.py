@@ -2,17 +2,26 @@
 PoC Certified Verification System
 Shared verification across all users with network effect
 """
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, HTTPException, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update
-from pydantic import BaseModel
-from typing import Optional
+from sqlalchemy import select
+from pydantic import BaseModel, Field
+from typing import Optional, List, Dict
 from datetime import datetime
+import asyncio
 import hashlib
 import json
 
-from app.database import get_db
-from app.models import Verification, Classification, ContentScan, ContentType
+from app.config import settings
+from app.database import async_session, dialect_insert
+from app.models import Verification, Classification, ContentType
+from app.scan_buffer import scan_buffer
+from app.view_counter import view_counts
+from app.rollups import increment_verification_rollups, verification_totals
+from app.verification_filter import verification_filter
+from app.verification_snapshot import snapshots
+from app.stats_cache import stats_cache
+from app.heavy_hitters import heavy_hitters
 from app.detection.text import text_detector
 
 router = APIRouter(prefix="/api/v1", tags=["verification"])
@@ -33,6 +42,7 @@ class VerifyResponse(BaseModel):
     first_seen: datetime
     cached: bool  # True if this was already in database
     message: str
+    view_count_staleness_ms: int = 0  # view_count may lag other workers by up to this
 
 class CheckResponse(BaseModel):
     content_hash: str
@@ -42,6 +52,21 @@ class CheckResponse(BaseModel):
     ai_probability: float
     view_count: int
     first_seen: datetime
+    view_count_staleness_ms: int = 0  # view_count may lag other workers by up to this
+
+class BatchCheckRequest(BaseModel):
+    content_hashes: List[str] = Field(..., max_length=500)
+
+class BatchCheckResponse(BaseModel):
+    found: Dict[str, CheckResponse]  # keyed by content hash
+    missing: List[str]
+    view_count_staleness_ms: int = 0
+
+class BatchVerifyRequest(BaseModel):
+    posts: List[VerifyRequest] = Field(..., max_length=100)
+
+class BatchVerifyResponse(BaseModel):
+    results: List[Optional[VerifyResponse]]  # input order; null if detection failed
 
 def normalize_text(text: str) -> str:
     """Normalize text for consistent hashing"""
@@ -54,90 +79,244 @@ def hash_content(text: str) -> str:
     normalized = normalize_text(text)
     return hashlib.sha256(normalized.encode()).hexdigest()
 
+# Columns returned for a known verification
+_RETURNED = (
+    Verification.content_hash,
+    Verification.classification,
+    Verification.confidence,
+    Verification.ai_probability,
+    Verification.view_count,
+    Verification.first_seen
+)
+
+async def _record_view(content_hash: str):
+    """Look up a verification and count the view (None if unknown)
+
+    The row is only read; the increment is coalesced in memory and flushed
+    in batches, so hot posts don't contend on the row lock.
+    """
+    if not verification_filter.might_contain(content_hash):
+        return None
+
+    async with async_session() as db:
+        result = await db.execute(
+            select(*_RETURNED).where(Verification.content_hash == content_hash)
+        )
+        verification = result.one_or_none()
+    if not verification:
+        return None
+
+    pending = view_counts.record(content_hash, verification.classification)
+    heavy_hitters.record(content_hash)
+    return verification, verification.view_count + pending
+
+async def _lookup_many(content_hashes: List[str]) -> list:
+    """Known verifications among content_hashes, in one query"""
+    if not content_hashes:
+        return []
+    async with async_session() as db:
+        result = await db.execute(
+            select(*_RETURNED).where(Verification.content_hash.in_(content_hashes))
+        )
+        return result.all()
+
 @router.get("/check/{content_hash}")
-async def check_verification(
-    content_hash: str,
-    db: AsyncSession = Depends(get_db)
-) -> CheckResponse:
+async def check_verification(content_hash: str) -> CheckResponse:
     """
     Quick lookup: check if content is already verified
     Returns cached verification or 404 if not found
     """
-    result = await db.execute(
-        select(Verification).where(Verification.content_hash == content_hash)
-    )
-    verification = result.scalar_one_or_none()
+    viewed = await _record_view(content_hash)
 
-    if not verification:
+    if not viewed:
         raise HTTPException(status_code=404, detail="Content not verified yet")
 
-    # Increment view count
-    await db.execute(
-        update(Verification)
-        .where(Verification.content_hash == content_hash)
-        .values(
-            view_count=Verification.view_count + 1,
-            last_verified=datetime.utcnow()
+    verification, view_count = viewed
+
+    return CheckResponse(
+        content_hash=verification.content_hash,
+        verified=True,
+        classification=verification.classification.value,
+        confidence=verification.confidence,
+        ai_probability=verification.ai_probability,
+        view_count=view_count,
+        first_seen=verification.first_seen,
+        view_count_staleness_ms=view_counts.staleness_ms
+    )
+
+@router.post("/check/batch")
+async def check_verifications(request: BatchCheckRequest) -> BatchCheckResponse:
+    """
+    Bulk lookup: resolve many content hashes with one query
+    Views are counted for every hash found
+    """
+    content_hashes = list(dict.fromkeys(request.content_hashes))
+
+    # Definite misses never reach the database
+    candidates = [h for h in content_hashes if verification_filter.might_contain(h)]
+
+    found = {}
+    rows = await _lookup_many(candidates)
+
+    for verification in rows:
+        view_count = verification.view_count + view_counts.record(verification.content_hash, verification.classification)
+        heavy_hitters.record(verification.content_hash)
+        found[verification.content_hash] = CheckResponse(
+            content_hash=verification.content_hash,
+            verified=True,
+            classification=verification.classification.value,
+            confidence=verification.confidence,
+            ai_probability=verification.ai_probability,
+            view_count=view_count,
+            first_seen=verification.first_seen,
+            view_count_staleness_ms=view_counts.staleness_ms
         )
+
+    return BatchCheckResponse(
+        found=found,
+        missing=[h for h in content_hashes if h not in found],
+        view_count_staleness_ms=view_counts.staleness_ms
     )
-    await db.commit()
 
-    return CheckResponse(
+# Determine classification enum
+CLASSIFICATION_MAP = {
+    "AI": Classification.AI,
+    "LIKELY_AI": Classification.AI,
+    "MIXED": Classification.MIXED,
+    "LIKELY_HUMAN": Classification.HUMAN,
+    "HUMAN": Classification.HUMAN,
+    "UNCERTAIN": Classification.UNCERTAIN
+}
+
+def _cached_response(verification, view_count: int) -> VerifyResponse:
+    return VerifyResponse(
         content_hash=verification.content_hash,
         verified=True,
         classification=verification.classification.value,
         confidence=verification.confidence,
         ai_probability=verification.ai_probability,
-        view_count=verification.view_count + 1,  # Include the increment
-        first_seen=verification.first_seen
+        view_count=view_count,
+        first_seen=verification.first_seen,
+        cached=True,
+        message=f"PoC Certified - Verified by {view_count} users",
+        view_count_staleness_ms=view_counts.staleness_ms
     )
 
+async def _save_verifications(detected: List[tuple]) -> Dict[str, VerifyResponse]:
+    """Upsert new verifications in one statement and queue their content scans
+
+    detected holds (request, content_hash, detection_result) for distinct hashes.
+    A hash another request inserted first just gets its view counted.
+    """
+    now = datetime.utcnow()
+    rows = []
+    scans = []
+    for request, content_hash, detection_result in detected:
+        classification = CLASSIFICATION_MAP.get(
+            detection_result.classification,
+            Classification.UNCERTAIN
+        )
+        scores = json.dumps(detection_result.scores) if detection_result.scores else None
+        preview = request.content[:200] if request.content else None
+
+        rows.append(dict(
+            content_hash=content_hash,
+            classification=classification,
+            confidence=detection_result.confidence,
+            ai_probability=detection_result.ai_probability,
+            platform=request.platform,
+            post_id=request.post_id,
+            post_url=request.post_url,
+            content_preview=preview,
+            view_count=1,
+            first_seen=now,
+            last_verified=now,
+            scores=scores
+        ))
+        scans.append(dict(
+            content_hash=content_hash,
+            content_type=ContentType.TEXT,
+            content_preview=preview,
+            classification=classification,
+            ai_probability=detection_result.ai_probability,
+            confidence=detection_result.confidence,
+            source_url=request.post_url,
+            source_platform=request.platform,
+            twitter_tweet_id=request.post_id if request.platform == "twitter" else None,
+            scores=scores
+        ))
+
+    if not rows:
+        return {}
+
+    table = Verification.__table__
+    stmt = dialect_insert(table).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['content_hash'],
+        set_={
+            'view_count': table.c.view_count + 1,
+            'last_verified': now
+        }
+    ).returning(*_RETURNED)
+
+    async with async_session() as db:
+        saved = (await db.execute(stmt)).all()
+        # New rows count as a verification and their first view; conflicts as a view
+        await increment_verification_rollups(db, [
+            (now, row.classification, 1 if row.view_count == 1 else 0, 1) for row in saved
+        ])
+        await db.commit()
+    verification_filter.add(row.content_hash for row in saved)
+    for row in saved:
+        heavy_hitters.record(row.content_hash)
+
+    # Also record in content_scans for tracking (written behind the response)
+    await scan_buffer.submit_many(scans)
+
+    responses = {}
+    for verification in saved:
+        if verification.view_count > 1:
+            # Verified concurrently by another user; theirs is the shared result
+            responses[verification.content_hash] = _cached_response(verification, verification.view_count)
+            continue
+
+        responses[verification.content_hash] = VerifyResponse(
+            content_hash=verification.content_hash,
+            verified=True,
+            classification=verification.classification.value,
+            confidence=verification.confidence,
+            ai_probability=verification.ai_probability,
+            view_count=1,
+            first_seen=verification.first_seen,
+            cached=False,
+            message="PoC Certified - First verification"
+        )
+    return responses
+
 @router.post("/verify")
-async def verify_content(
-    request: VerifyRequest,
-    db: AsyncSession = Depends(get_db)
-) -> VerifyResponse:
+async def verify_content(request: VerifyRequest) -> VerifyResponse:
     """
     Verify content - either return cached result or run detection and cache
 
     Flow:
     1. Hash the content
     2. Check if hash exists in verifications table
-    3. If exists: increment view_count, return cached result
-    4. If not: run AI detection, save result, return new verification
+    3. If exists: count the view (coalesced), return cached result
+    4. If not: run AI detection, then upsert - a concurrent verifier that
+       inserted first just gets its view counted
+
+    Steps 2 and 4 each use a short session of their own, so no pooled
+    connection is held while detection waits on remote models.
     """
     # Generate content hash
     content_hash = hash_content(request.content)
 
-    # Check if already verified
-    result = await db.execute(
-        select(Verification).where(Verification.content_hash == content_hash)
-    )
-    existing = result.scalar_one_or_none()
-
-    if existing:
-        # Already verified - increment view count and return
-        await db.execute(
-            update(Verification)
-            .where(Verification.content_hash == content_hash)
-            .values(
-                view_count=Verification.view_count + 1,
-                last_verified=datetime.utcnow()
-            )
-        )
-        await db.commit()
+    # Already verified - view counted, return cached result
+    viewed = await _record_view(content_hash)
 
-        return VerifyResponse(
-            content_hash=content_hash,
-            verified=True,
-            classification=existing.classification.value,
-            confidence=existing.confidence,
-            ai_probability=existing.ai_probability,
-            view_count=existing.view_count + 1,
-            first_seen=existing.first_seen,
-            cached=True,
-            message=f"PoC Certified - Verified by {existing.view_count + 1} users"
-        )
+    if viewed:
+        existing, view_count = viewed
+        return _cached_response(existing, view_count)
 
     # Not verified yet - run detection
     detection_result = await text_detector.detect(
@@ -145,98 +324,139 @@ async def verify_content(
         source_platform=request.platform
     )
 
-    # Determine classification enum
-    classification_map = {
-        "AI": Classification.AI,
-        "LIKELY_AI": Classification.AI,
-        "MIXED": Classification.MIXED,
-        "LIKELY_HUMAN": Classification.HUMAN,
-        "HUMAN": Classification.HUMAN,
-        "UNCERTAIN": Classification.UNCERTAIN
-    }
-    classification = classification_map.get(
-        detection_result.classification,
-        Classification.UNCERTAIN
-    )
+    saved = await _save_verifications([(request, content_hash, detection_result)])
+    return saved[content_hash]
 
-    # Create new verification record
-    verification = Verification(
-        content_hash=content_hash,
-        classification=classification,
-        confidence=detection_result.confidence,
-        ai_probability=detection_result.ai_probability,
-        platform=request.platform,
-        post_id=request.post_id,
-        post_url=request.post_url,
-        content_preview=request.content[:200] if request.content else None,
-        view_count=1,
-        scores=json.dumps(detection_result.scores) if detection_result.scores else None
-    )
+@router.post("/verify/batch")
+async def verify_batch(request: BatchVerifyRequest) -> BatchVerifyResponse:
+    """
+    Verify many posts in one round trip
+
+    Hits are resolved with one query; only misses run detection (concurrently),
+    and all new verifications are written in one transaction. Results follow
+    input order; a post whose detection failed gets null.
+    """
+    hashes = [hash_content(post.content) for post in request.posts]
+
+    # One request per distinct post
+    posts = {}
+    for content_hash, post in zip(hashes, request.posts):
+        posts.setdefault(content_hash, post)
+
+    candidates = [h for h in posts if verification_filter.might_contain(h)]
+    responses = {}
+    for verification in await _lookup_many(candidates):
+        view_count = verification.view_count + view_counts.record(verification.content_hash, verification.classification)
+        heavy_hitters.record(verification.content_hash)
+        responses[verification.content_hash] = _cached_response(verification, view_count)
+
+    # Not verified yet - run detection for the misses
+    misses = [(content_hash, post) for content_hash, post in posts.items() if content_hash not in responses]
+    semaphore = asyncio.Semaphore(max(settings.DETECT_BATCH_CONCURRENCY, 1))
 
-    db.add(verification)
-
-    # Also save to content_scans for tracking
-    content_scan = ContentScan(
-        content_hash=content_hash,
-        content_type=ContentType.TEXT,
-        content_preview=request.content[:200] if request.content else None,
-        classification=classification,
-        ai_probability=detection_result.ai_probability,
-        confidence=detection_result.confidence,
-        source_url=request.post_url,
-        source_platform=request.platform,
-        twitter_tweet_id=request.post_id if request.platform == "twitter" else None,
-        scores=json.dumps(detection_result.scores) if detection_result.scores else None
+    async def detect(post):
+        async with semaphore:
+            return await text_detector.detect(post.content, source_platform=post.platform)
+
+    detections = await asyncio.gather(
+        *[detect(post) for _, post in misses],
+        return_exceptions=True
     )
-    db.add(content_scan)
 
-    await db.commit()
+    detected = []
+    for (content_hash, post), detection_result in zip(misses, detections):
+        if isinstance(detection_result, BaseException):
+            print(f"Batch verification error: {detection_result}")
+            continue
+        detected.append((post, content_hash, detection_result))
 
-    return VerifyResponse(
-        content_hash=content_hash,
-        verified=True,
-        classification=classification.value,
-        confidence=detection_result.confidence,
-        ai_probability=detection_result.ai_probability,
-        view_count=1,
-        first_seen=verification.first_seen,
-        cached=False,
-        message="PoC Certified - First verification"
+    responses.update(await _save_verifications(detected))
+
+    return BatchVerifyResponse(
+        results=[responses.get(content_hash) for content_hash in hashes]
     )
 
-@router.get("/stats/verifications")
-async def get_verification_stats(db: AsyncSession = Depends(get_db)):
-    """Get overall verification statistics"""
-    from sqlalchemy import func
+@router.get("/verifications/snapshot")
+async def verification_snapshot(request: Request, since: int = 0) -> Response:
+    """
+    Binary snapshot of verified hashes for local lookups (see app.verification_snapshot)
+    Pass since=<X-Snapshot-Version of your copy> to download only the delta
+    """
+    version = snapshots.current_version()
+    since = min(max(since, 0), version)
+    etag = f'"vsnp{since}-{version}"'
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={snapshots.seconds_until_next()}",
+        "X-Snapshot-Version": str(version)
+    }
 
-    # Total verifications
-    total_result = await db.execute(select(func.count(Verification.id)))
-    total_verifications = total_result.scalar() or 0
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
 
-    # Total views across all verifications
-    views_result = await db.execute(select(func.sum(Verification.view_count)))
-    total_views = views_result.scalar() or 0
+    data = await snapshots.get(since, version)
+    return Response(content=data, media_type="application/octet-stream", headers=headers)
 
-    # Human vs AI breakdown
-    human_result = await db.execute(
-        select(func.count(Verification.id))
-        .where(Verification.classification == Classification.HUMAN)
-    )
-    human_count = human_result.scalar() or 0
+async def _verifications_by_hash(db: AsyncSession, content_hashes: List[str]) -> List[Verification]:
+    if not content_hashes:
+        return []
+    result = await db.execute(select(Verification).where(Verification.content_hash.in_(content_hashes)))
+    return result.scalars().all()
 
-    ai_result = await db.execute(
-        select(func.count(Verification.id))
-        .where(Verification.classification == Classification.AI)
+@router.get("/verifications/trending")
+async def get_trending_verifications(response: Response, window: int = 3600, limit: int = 10):
+    """Most viewed verified content over the last window seconds (up to HEAVY_HITTERS_WINDOW_S)"""
+    # Whole slices only, which also bounds the number of cache entries
+    slice_seconds = heavy_hitters.slice_seconds
+    window = min(max(window // slice_seconds, 1) * slice_seconds, heavy_hitters.window)
+    limit = min(max(limit, 1), 50)
+    return await stats_cache.serve(
+        f"trending:{window}:{limit}", response, lambda db: _trending_verifications(db, window, limit)
     )
-    ai_count = ai_result.scalar() or 0
 
-    # Most verified content (top 10)
-    top_verified = await db.execute(
-        select(Verification)
-        .order_by(Verification.view_count.desc())
-        .limit(10)
-    )
-    top_content = top_verified.scalars().all()
+async def _trending_verifications(db: AsyncSession, window: int, limit: int) -> Dict:
+    trending = await heavy_hitters.top(db, limit=limit, window=window)
+    verifications = {v.content_hash: v for v in await _verifications_by_hash(db, [h for h, _, _ in trending])}
+
+    return {
+        "window_seconds": window,
+        "trending": [
+            {
+                "content_hash": content_hash,
+                "content_preview": verifications[content_hash].content_preview,
+                "classification": verifications[content_hash].classification.value,
+                "platform": verifications[content_hash].platform,
+                "views_in_window": views,
+                "views_error": error,  # views_in_window overestimates by at most this
+                "view_count": verifications[content_hash].view_count,
+                "first_seen": verifications[content_hash].first_seen.isoformat()
+            }
+            for content_hash, views, error in trending
+            if content_hash in verifications
+        ]
+    }
+
+@router.get("/stats/verifications")
+async def get_verification_stats(response: Response):
+    """Get overall verification statistics"""
+    return await stats_cache.serve("verifications", response, _verification_stats)
+
+async def _verification_stats(db: AsyncSession) -> Dict:
+    # Totals and breakdown from the verification rollups
+    totals = await verification_totals(db)
+    total_verifications = sum(count for count, _ in totals.values())
+    total_views = sum(views for _, views in totals.values())
+    human_count = totals.get(Classification.HUMAN, (0, 0))[0]
+    ai_count = totals.get(Classification.AI, (0, 0))[0]
+
+    # Most verified content (top 10): candidates from the heavy-hitters
+    # tracker, ranked by their stored counts
+    candidates = await heavy_hitters.top(db, limit=20)
+    top_content = sorted(
+        await _verifications_by_hash(db, [content_hash for content_hash, _, _ in candidates]),
+        key=lambda v: v.view_count,
+        reverse=True
+    )[:10]
 
     return {
         "total_unique_content": total_verifications,
@@ -0,0 +1,170 @@
+"""
+Write-behind buffer for ContentScan rows
+
+Scan records are purely analytical, so request handlers hand them to this
+buffer instead of inserting and committing themselves. A background task
+flushes them as one multi-row INSERT every SCAN_FLUSH_INTERVAL_MS or
+SCAN_FLUSH_ROWS rows. When the queue is full, submitters wait until the
+flusher catches up (backpressure); on shutdown the queue is drained.
+A failed flush is retried SCAN_FLUSH_RETRIES times with exponential backoff
+(queued rows wait meanwhile) before its rows are dropped and counted.
+Each flush also increments the scan rollups in the same transaction and,
+once committed, is published to the live stats stream and the
+distinct-content sketches.
+"""
+import time
+import uuid
+import asyncio
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+from sqlalchemy import insert
+from app.config import settings
+from app.database import engine
+from app.models import ContentScan
+from app.rollups import increment_scan_rollups
+from app.live_stats import live_stats
+from app.content_sketches import content_sketches
+
+_COLUMNS = [column.name for column in ContentScan.__table__.columns]
+
+# Marks the end of the queue on shutdown
+_STOP = object()
+
+class ScanWriteBuffer:
+    def __init__(self, max_rows: int = 10000, flush_rows: int = 500, flush_interval: float = 0.25,
+                 retries: int = 5):
+        self.max_rows = max_rows
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval
+        self.retries = retries
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+        self.submitted = 0
+        self.written = 0
+        self.errors = 0
+        self.dropped = 0
+        self.flushes = 0
+        self.backpressure_waits = 0
+        self.last_flush_ms = 0.0
+
+    def _row(self, values: Dict) -> Dict:
+        """Complete a partial set of column values (multi-row VALUES needs every key)"""
+        row = dict.fromkeys(_COLUMNS)
+        row.update(values)
+        if row['id'] is None:
+            row['id'] = uuid.uuid4()
+        if row['created_at'] is None:
+            # Stamp now, not at flush time
+            row['created_at'] = datetime.utcnow()
+        return row
+
+    async def submit(self, values: Dict):
+        """Queue one ContentScan row (column name -> value)"""
+        await self.submit_many([values])
+
+    async def submit_many(self, rows: Iterable[Dict]):
+        rows = [self._row(values) for values in rows]
+        self.submitted += len(rows)
+
+        if self._task is None:
+            # Not running (scripts, shutdown): write through
+            await self._write(rows)
+            return
+
+        for row in rows:
+            if self._queue.full():
+                self.backpressure_waits += 1
+            await self._queue.put(row)
+
+    async def start(self):
+        if self._task is None:
+            self._queue = asyncio.Queue(maxsize=self.max_rows)
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Flush everything queued so far and stop the flusher"""
+        if self._task is None:
+            return
+        task, self._task = self._task, None
+        await self._queue.put(_STOP)
+        await task
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        stopping = False
+
+        while not stopping:
+            row = await self._queue.get()
+            if row is _STOP:
+                return
+
+            batch = [row]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.flush_rows:
+                try:
+                    row = self._queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        row = await asyncio.wait_for(self._queue.get(), remaining)
+                    except asyncio.TimeoutError:
+                        break
+
+                if row is _STOP:
+                    stopping = True
+                    break
+                batch.append(row)
+
+            await self._write(batch)
+
+    async def _write(self, rows: List[Dict]):
+        if not rows:
+            return
+
+        started = time.perf_counter()
+        for attempt in range(self.retries + 1):
+            try:
+                async with engine.begin() as conn:
+                    await conn.execute(insert(ContentScan.__table__).values(rows))
+                    await increment_scan_rollups(conn, rows)
+                break
+            except Exception as e:
+                self.errors += 1
+                if attempt == self.retries:
+                    print(f"Scan buffer flush error ({len(rows)} rows dropped): {e}")
+                    self.dropped += len(rows)
+                    return
+                print(f"Scan buffer flush error (retry {attempt + 1}/{self.retries}): {e}")
+                # Back off so a short outage passes; new rows queue up behind this batch
+                await asyncio.sleep(self.flush_interval * 2 ** attempt)
+
+        self.written += len(rows)
+        live_stats.publish_scans(rows)
+        content_sketches.add(rows)
+        self.flushes += 1
+        self.last_flush_ms = round((time.perf_counter() - started) * 1000, 2)
+
+    def stats(self) -> Dict:
+        return {
+            'running': self._task is not None,
+            'queued': self._queue.qsize() if self._queue else 0,
+            'submitted': self.submitted,
+            'written': self.written,
+            'errors': self.errors,
+            'dropped': self.dropped,
+            'flushes': self.flushes,
+            'rows_per_flush': round(self.written / self.flushes, 1) if self.flushes > 0 else 0,
+            'backpressure_waits': self.backpressure_waits,
+            'last_flush_ms': self.last_flush_ms
+        }
+
+scan_buffer = ScanWriteBuffer(
+    max_rows=settings.SCAN_BUFFER_SIZE,
+    flush_rows=settings.SCAN_FLUSH_ROWS,
+    flush_interval=settings.SCAN_FLUSH_INTERVAL_MS / 1000,
+    retries=settings.SCAN_FLUSH_RETRIES
+)
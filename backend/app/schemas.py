@@ -80,10 +80,12 @@ class StatsResponse(BaseModel):
     human_percentage: float
     mixed_percentage: float
     bot_percentage: float
+    classification_counts: Dict[str, int] = {}  # scans per classification
     
     twitter_stats: Dict[str, Any]
     reddit_stats: Dict[str, Any]
     web_stats: Dict[str, Any]
+    platform_stats: Dict[str, Dict[str, Any]] = {}  # every platform seen
     
     recent_scans: List[Dict[str, Any]]
     attention_stats: Dict[str, Any]
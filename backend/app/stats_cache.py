@@ -0,0 +1,123 @@
+"""
+TTL cache for stats endpoint responses
+
+Every open dashboard polls the stats endpoints, so each response is computed
+at most once per TTL (STATS_CACHE_TTLS, per endpoint) no matter how many
+viewers there are:
+- fresh: served from memory
+- stale for up to STATS_CACHE_STALE_S more: served from memory while one
+  background refresh recomputes it (stale-while-revalidate)
+- missing or older: concurrent callers wait on one shared computation
+
+Responses carry Age (seconds since computed) and a matching Cache-Control.
+"""
+import time
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Tuple
+from fastapi import Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import settings
+from app.database import async_session
+from app.detection.singleflight import SingleFlight
+
+DEFAULT_TTL = 10.0
+
+class StatsCache:
+    def __init__(self, ttls: Dict[str, float], stale: float = 60.0):
+        self.ttls = ttls
+        self.stale = stale
+
+        # key -> (value, monotonic time computed)
+        self._entries: Dict[str, Tuple[Any, float]] = {}
+        self._flight = SingleFlight()
+        self._refreshing: Dict[str, asyncio.Task] = {}
+
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.refresh_errors = 0
+
+    def ttl(self, key: str) -> float:
+        # "name:params" keys share name's TTL
+        return self.ttls.get(key.split(":", 1)[0], DEFAULT_TTL)
+
+    async def get(self, key: str, compute: Callable[[], Awaitable]) -> Tuple[Any, float]:
+        """Value for key and its age in seconds"""
+        entry = self._entries.get(key)
+        if entry is not None:
+            value, computed_at = entry
+            age = time.monotonic() - computed_at
+            if age < self.ttl(key):
+                self.hits += 1
+                return value, age
+            if age < self.ttl(key) + self.stale:
+                self.stale_hits += 1
+                self._revalidate(key, compute)
+                return value, age
+
+        self.misses += 1
+        value, computed_at = await self._flight.do(key, lambda: self._compute(key, compute))
+        return value, time.monotonic() - computed_at
+
+    async def _compute(self, key: str, compute: Callable[[], Awaitable]) -> Tuple[Any, float]:
+        value = await compute()
+        entry = self._entries[key] = (value, time.monotonic())
+        return entry
+
+    def _revalidate(self, key: str, compute: Callable[[], Awaitable]):
+        if key in self._refreshing:
+            return
+        task = asyncio.ensure_future(self._refresh(key, compute))
+        self._refreshing[key] = task
+        task.add_done_callback(lambda _: self._refreshing.pop(key, None))
+
+    async def _refresh(self, key: str, compute: Callable[[], Awaitable]):
+        try:
+            await self._flight.do(key, lambda: self._compute(key, compute))
+            self.refreshes += 1
+        except Exception as e:
+            # Keep serving the stale value until it expires
+            print(f"Stats refresh error ({key}): {e}")
+            self.refresh_errors += 1
+
+    async def fetch(self, key: str, compute: Callable[[AsyncSession], Awaitable]) -> Tuple[Any, float]:
+        """Cached compute(db) and its age in seconds
+
+        compute gets a session of its own, since a background refresh
+        outlives the request that triggered it.
+        """
+        async def run():
+            async with async_session() as db:
+                return await compute(db)
+
+        return await self.get(key, run)
+
+    async def serve(self, key: str, response: Response,
+                    compute: Callable[[AsyncSession], Awaitable]) -> Any:
+        """Cached compute(db) for an endpoint, with Age/Cache-Control set on response"""
+        value, age = await self.fetch(key, compute)
+        response.headers["Age"] = str(int(age))
+        response.headers["Cache-Control"] = (
+            f"max-age={max(int(self.ttl(key) - age), 0)}, stale-while-revalidate={int(self.stale)}"
+        )
+        return value
+
+    def stats(self) -> Dict:
+        now = time.monotonic()
+        requests = self.hits + self.stale_hits + self.misses
+        return {
+            'entries': {key: round(now - computed_at, 1) for key, (_, computed_at) in self._entries.items()},
+            'ttls': self.ttls,
+            'hits': self.hits,
+            'stale_hits': self.stale_hits,
+            'misses': self.misses,
+            'hit_rate': round((self.hits + self.stale_hits) / requests, 4) if requests > 0 else 0,
+            'refreshes': self.refreshes,
+            'refresh_errors': self.refresh_errors
+        }
+
+stats_cache = StatsCache(
+    ttls=settings.stats_cache_ttls,
+    stale=settings.STATS_CACHE_STALE_S
+)
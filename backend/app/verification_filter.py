@@ -0,0 +1,176 @@
+"""
+In-memory Bloom filter of verified content hashes
+
+Most /check lookups are for posts nobody has verified yet. The filter answers
+those definite misses without a database query. It is built from the
+verifications table at startup, updated on every insert, and re-synced every
+VERIFICATION_FILTER_SYNC_MS with rows other workers inserted meanwhile, so a
+hash verified elsewhere can look missing here for at most that long.
+"""
+import math
+import time
+import asyncio
+import hashlib
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Optional
+import numpy as np
+from sqlalchemy import select, func
+from app.config import settings
+from app.database import async_session
+from app.models import Verification
+
+class BloomFilter:
+    def __init__(self, capacity: int, fp_rate: float):
+        self.capacity = max(capacity, 1)
+        self.fp_rate = fp_rate
+        self.size = max(int(-self.capacity * math.log(fp_rate) / math.log(2) ** 2), 64)
+        self.hashes = max(int(round(self.size / self.capacity * math.log(2))), 1)
+        self._bits = np.zeros((self.size + 7) // 8, dtype=np.uint8)
+        self.count = 0
+
+    def _positions(self, key: str) -> np.ndarray:
+        # Content hashes are already uniform; anything else is hashed first
+        try:
+            digest = bytes.fromhex(key) if len(key) == 64 else None
+        except ValueError:
+            digest = None
+        if digest is None:
+            digest = hashlib.sha256(key.encode()).digest()
+
+        # Double hashing: h1 + i * h2
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:16], 'little') | 1
+        return np.array([(h1 + i * h2) % self.size for i in range(self.hashes)], dtype=np.int64)
+
+    def add(self, key: str):
+        positions = self._positions(key)
+        np.bitwise_or.at(self._bits, positions >> 3, (1 << (positions & 7)).astype(np.uint8))
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        positions = self._positions(key)
+        return bool(np.all(self._bits[positions >> 3] & (1 << (positions & 7)).astype(np.uint8)))
+
+class VerificationFilter:
+    def __init__(self, capacity: int = 1000000, fp_rate: float = 0.001, sync_interval: float = 5.0):
+        self.capacity = capacity
+        self.fp_rate = fp_rate
+        self.sync_interval = sync_interval
+
+        self._bloom: Optional[BloomFilter] = None
+        self._synced_to: Optional[datetime] = None
+        self._task: Optional[asyncio.Task] = None
+
+        self.negatives = 0
+        self.passed = 0
+        self.syncs = 0
+        self.sync_errors = 0
+        self.rebuilds = 0
+        self.last_sync_at: Optional[float] = None
+
+    @property
+    def ready(self) -> bool:
+        return self._bloom is not None
+
+    def might_contain(self, content_hash: str) -> bool:
+        """False only if content_hash is definitely not verified (True until loaded)"""
+        if self._bloom is None:
+            return True
+        if content_hash in self._bloom:
+            self.passed += 1
+            return True
+        self.negatives += 1
+        return False
+
+    def add(self, content_hashes: Iterable[str]):
+        """Record newly inserted verifications"""
+        if self._bloom is None:
+            return
+        for content_hash in content_hashes:
+            # Syncs overlap; skip repeats so count tracks distinct hashes
+            if content_hash not in self._bloom:
+                self._bloom.add(content_hash)
+
+    async def start(self):
+        try:
+            await self.rebuild()
+        except Exception as e:
+            # Without a filter every lookup just goes to the database
+            print(f"Verification filter build error: {e}")
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def rebuild(self):
+        """Load every verified hash, sized for at least twice the current count"""
+        started = datetime.utcnow()
+        async with async_session() as session:
+            total = (await session.execute(select(func.count(Verification.id)))).scalar() or 0
+            bloom = BloomFilter(max(self.capacity, total * 2), self.fp_rate)
+
+            hashes = await session.stream_scalars(
+                select(Verification.content_hash).execution_options(yield_per=10000)
+            )
+            async for content_hash in hashes:
+                bloom.add(content_hash)
+
+        self._bloom = bloom
+        self._synced_to = started
+        self.rebuilds += 1
+
+    async def sync(self):
+        """Add hashes inserted since the last sync (by any worker)"""
+        if self._bloom is None or self._bloom.count > self._bloom.capacity:
+            await self.rebuild()
+            return
+
+        started = datetime.utcnow()
+        # Overlap generously: first_seen comes from each worker's own clock
+        since = self._synced_to - timedelta(seconds=self.sync_interval + 60)
+        async with async_session() as session:
+            result = await session.execute(
+                select(Verification.content_hash).where(Verification.first_seen >= since)
+            )
+            self.add(result.scalars())
+
+        self._synced_to = started
+        self.syncs += 1
+        self.last_sync_at = time.time()
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.sync_interval)
+            try:
+                await self.sync()
+            except Exception as e:
+                print(f"Verification filter sync error: {e}")
+                self.sync_errors += 1
+
+    def stats(self) -> Dict:
+        bloom = self._bloom
+        return {
+            'ready': bloom is not None,
+            'entries': bloom.count if bloom else 0,
+            'capacity': bloom.capacity if bloom else 0,
+            'bits': bloom.size if bloom else 0,
+            'hashes': bloom.hashes if bloom else 0,
+            'fp_rate': self.fp_rate,
+            'negatives': self.negatives,
+            'passed': self.passed,
+            'syncs': self.syncs,
+            'sync_errors': self.sync_errors,
+            'rebuilds': self.rebuilds,
+            'max_staleness_ms': int(self.sync_interval * 1000),
+            'last_sync_age_s': round(time.time() - self.last_sync_at, 1) if self.last_sync_at else None
+        }
+
+verification_filter = VerificationFilter(
+    capacity=settings.VERIFICATION_FILTER_CAPACITY,
+    fp_rate=settings.VERIFICATION_FILTER_FP_RATE,
+    sync_interval=settings.VERIFICATION_FILTER_SYNC_MS / 1000
+)
@@ -0,0 +1,172 @@
+"""
+Compact, versioned snapshots of verified hashes for clients and edge nodes
+
+A snapshot is a fixed-width binary file sorted by hash, so it can be
+memory-mapped and binary-searched without parsing:
+
+    header   32 bytes   magic "VSNP", format, flags (1 = delta), since, version, count
+    records  36 bytes   sha256 digest, classification, confidence, ai_probability, reserved
+
+confidence and ai_probability are quantized to 0-255. classification indexes
+SNAPSHOT_CLASSES. Versions are millisecond watermarks on first_seen, quantized
+to SNAPSHOT_INTERVAL_S and held back by SNAPSHOT_SETTLE_S so rows still being
+committed by other workers land in the next delta rather than being skipped.
+A delta (since=<version>) holds the rows verified after that version; since
+verifications never change classification, base + deltas equals a fresh snapshot.
+"""
+import mmap
+import time
+import struct
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+import numpy as np
+from sqlalchemy import select
+from app.config import settings
+from app.database import async_session
+from app.models import Verification, Classification
+from app.detection.singleflight import SingleFlight
+
+SNAPSHOT_MAGIC = b"VSNP"
+SNAPSHOT_FORMAT = 1
+SNAPSHOT_CLASSES = [c.value for c in Classification]
+FLAG_DELTA = 1
+
+_HEADER = struct.Struct("<4sHHQQI4x")
+_RECORD = np.dtype([
+    # Raw bytes: "S32" would strip trailing NULs off digests
+    ("hash", "V32"),
+    ("classification", "u1"),
+    ("confidence", "u1"),
+    ("ai_probability", "u1"),
+    ("reserved", "u1"),
+])
+
+def encode_snapshot(records: np.ndarray, version: int, since: int = 0) -> bytes:
+    """Serialize records (any order, _RECORD dtype) sorted by hash"""
+    records = np.sort(records, order="hash")
+    flags = FLAG_DELTA if since else 0
+    return _HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_FORMAT, flags, since, version, len(records)) + records.tobytes()
+
+def decode_snapshot(data) -> Tuple[Dict, np.ndarray]:
+    """Header fields and a zero-copy record view of a snapshot buffer"""
+    magic, fmt, flags, since, version, count = _HEADER.unpack_from(data, 0)
+    if magic != SNAPSHOT_MAGIC or fmt != SNAPSHOT_FORMAT:
+        raise ValueError(f"Not a verified-hash snapshot (format {SNAPSHOT_FORMAT})")
+    records = np.frombuffer(data, dtype=_RECORD, count=count, offset=_HEADER.size)
+    return {"delta": bool(flags & FLAG_DELTA), "since": since, "version": version}, records
+
+def apply_delta(snapshot: bytes, delta: bytes) -> bytes:
+    """Merge a delta into a full snapshot, giving the snapshot at the delta's version"""
+    _, base = decode_snapshot(snapshot)
+    header, changes = decode_snapshot(delta)
+    merged = np.unique(np.concatenate([base, changes]))
+    return encode_snapshot(merged, header["version"])
+
+class VerifiedHashSnapshot:
+    """Read-only, memory-mapped snapshot file with binary-search lookups"""
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        header, self._records = decode_snapshot(self._mmap)
+        self.version = header["version"]
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def lookup(self, content_hash: str) -> Optional[Dict]:
+        key = np.void(bytes.fromhex(content_hash))
+        index = int(np.searchsorted(self._records["hash"], key))
+        if index == len(self._records) or self._records["hash"][index] != key:
+            return None
+        record = self._records[index]
+        return {
+            "classification": SNAPSHOT_CLASSES[int(record["classification"])],
+            "confidence": round(int(record["confidence"]) / 255, 3),
+            "ai_probability": round(int(record["ai_probability"]) / 255, 3)
+        }
+
+class SnapshotBuilder:
+    """Builds snapshots and deltas on demand, cached per (since, version)"""
+
+    def __init__(self, interval: int = 60, settle: int = 30, cache_size: int = 32):
+        self.interval = max(interval, 1)
+        self.settle = settle
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[Tuple[int, int], bytes]" = OrderedDict()
+        self._flight = SingleFlight()
+
+        self.builds = 0
+        self.cache_hits = 0
+        self.last_build_ms = 0.0
+
+    def current_version(self) -> int:
+        """Latest published version (epoch ms)"""
+        settled = time.time() - self.settle
+        return int(settled // self.interval * self.interval * 1000)
+
+    def seconds_until_next(self) -> int:
+        return int(self.interval - (time.time() - self.settle) % self.interval) + 1
+
+    async def get(self, since: int, version: int) -> bytes:
+        key = (since, version)
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            self.cache_hits += 1
+            return cached
+
+        # Clients arriving together at a new version share one build
+        data = await self._flight.do(key, lambda: self._build(since, version))
+        self._cache[key] = data
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return data
+
+    async def _build(self, since: int, version: int) -> bytes:
+        started = time.perf_counter()
+        query = select(
+            Verification.content_hash,
+            Verification.classification,
+            Verification.confidence,
+            Verification.ai_probability
+        ).where(Verification.first_seen <= datetime.utcfromtimestamp(version / 1000))
+        if since:
+            query = query.where(Verification.first_seen > datetime.utcfromtimestamp(since / 1000))
+
+        hashes, classes, confidences, probabilities = [], [], [], []
+        async with async_session() as session:
+            rows = await session.stream(query.execution_options(yield_per=10000))
+            async for content_hash, classification, confidence, ai_probability in rows:
+                try:
+                    hashes.append(bytes.fromhex(content_hash))
+                except ValueError:
+                    continue
+                classes.append(SNAPSHOT_CLASSES.index(classification.value))
+                confidences.append(confidence)
+                probabilities.append(ai_probability)
+
+        records = np.zeros(len(hashes), dtype=_RECORD)
+        records["hash"] = hashes
+        records["classification"] = classes
+        records["confidence"] = np.clip(np.rint(np.array(confidences, dtype=np.float64) * 255), 0, 255)
+        records["ai_probability"] = np.clip(np.rint(np.array(probabilities, dtype=np.float64) * 255), 0, 255)
+
+        self.builds += 1
+        self.last_build_ms = round((time.perf_counter() - started) * 1000, 2)
+        return encode_snapshot(records, version, since)
+
+    def stats(self) -> Dict:
+        return {
+            "version": self.current_version(),
+            "builds": self.builds,
+            "cache_hits": self.cache_hits,
+            "cached": len(self._cache),
+            "last_build_ms": self.last_build_ms
+        }
+
+snapshots = SnapshotBuilder(
+    interval=settings.SNAPSHOT_INTERVAL_S,
+    settle=settings.SNAPSHOT_SETTLE_S
+)
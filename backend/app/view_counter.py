@@ -0,0 +1,127 @@
+"""
+Coalesced view counting for verifications
+
+/check and cached /verify hits used to UPDATE the verification row on every
+request, so a viral post serialized every viewer on one row lock. Views are
+now counted in memory and flushed every VIEW_COUNT_FLUSH_INTERVAL_MS as one
+batched UPDATE per hash; stored counts lag by at most one flush interval.
+The same transaction adds the views to the verification rollups.
+"""
+import time
+import asyncio
+from datetime import datetime
+from typing import Dict, List, Optional
+from sqlalchemy import update, bindparam
+from app.config import settings
+from app.database import engine
+from app.models import Verification, Classification
+from app.rollups import increment_verification_rollups
+
+class ViewCountCoalescer:
+    def __init__(self, flush_interval: float = 2.0):
+        self.flush_interval = flush_interval
+
+        # content_hash -> [views not yet flushed, latest view time, classification]
+        self._pending: Dict[str, List] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._stopping: Optional[asyncio.Event] = None
+
+        self.recorded = 0
+        self.flushed = 0
+        self.flushes = 0
+        self.errors = 0
+        self.last_flush_at: Optional[float] = None
+
+    @property
+    def staleness_ms(self) -> int:
+        """Upper bound on how far stored view counts lag behind"""
+        return int(self.flush_interval * 1000)
+
+    def record(self, content_hash: str, classification: Classification) -> int:
+        """Count one view; returns views for this hash not yet flushed"""
+        entry = self._pending.setdefault(content_hash, [0, None, classification])
+        entry[0] += 1
+        entry[1] = datetime.utcnow()
+        self.recorded += 1
+        return entry[0]
+
+    def pending(self, content_hash: str) -> int:
+        entry = self._pending.get(content_hash)
+        return entry[0] if entry else 0
+
+    async def start(self):
+        if self._task is None:
+            self._stopping = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the periodic flush and write out what is left"""
+        if self._task is not None:
+            # Let a flush in progress finish: cancelling it would drop the views it took
+            self._stopping.set()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.flush()
+
+    async def _run(self):
+        while not self._stopping.is_set():
+            try:
+                await asyncio.wait_for(self._stopping.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                await self.flush()
+
+    async def flush(self):
+        if not self._pending:
+            return
+
+        pending, self._pending = self._pending, {}
+        # Fixed lock order, so concurrent workers flushing the same hashes cannot deadlock
+        params = [
+            {'hash': content_hash, 'views': views, 'seen': seen}
+            for content_hash, (views, seen, _) in sorted(pending.items())
+        ]
+        table = Verification.__table__
+        stmt = (
+            update(table)
+            .where(table.c.content_hash == bindparam('hash'))
+            .values(
+                view_count=table.c.view_count + bindparam('views'),
+                last_verified=bindparam('seen')
+            )
+        )
+
+        try:
+            async with engine.begin() as conn:
+                await conn.execute(stmt, params)
+                await increment_verification_rollups(
+                    conn, [(seen, classification, 0, views) for views, seen, classification in pending.values()]
+                )
+        except Exception as e:
+            print(f"View count flush error: {e}")
+            self.errors += 1
+            # Keep the views for the next attempt
+            for content_hash, (views, seen, classification) in pending.items():
+                entry = self._pending.setdefault(content_hash, [0, seen, classification])
+                entry[0] += views
+                entry[1] = max(entry[1], seen)
+            return
+
+        self.flushed += sum(entry[0] for entry in pending.values())
+        self.flushes += 1
+        self.last_flush_at = time.time()
+
+    def stats(self) -> Dict:
+        return {
+            'pending_hashes': len(self._pending),
+            'pending_views': sum(entry[0] for entry in self._pending.values()),
+            'recorded': self.recorded,
+            'flushed': self.flushed,
+            'flushes': self.flushes,
+            'errors': self.errors,
+            'staleness_ms': self.staleness_ms,
+            'last_flush_age_s': round(time.time() - self.last_flush_at, 1) if self.last_flush_at else None
+        }
+
+view_counts = ViewCountCoalescer(
+    flush_interval=settings.VIEW_COUNT_FLUSH_INTERVAL_MS / 1000
+)
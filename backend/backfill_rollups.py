@@ -0,0 +1,132 @@
+"""
+Rebuild the stats rollups (scan_rollups, verification_rollups), the
+distinct-content sketches (content_sketches) and the top-verified seed
+(heavy_hitter_checkpoints) from raw data
+
+The API keeps the rollups up to date as it writes; run this once when
+deploying them, or to repair them. Stop the API workers first: increments
+made while the backfill runs would be wiped or counted twice.
+
+Historical views are attributed to each verification's first_seen bucket.
+The top-verified seed has no trending history; the first API worker to
+checkpoint afterwards takes it over.
+
+Usage:
+  python backfill_rollups.py
+"""
+import json
+import asyncio
+from datetime import datetime
+from sqlalchemy import select, delete, insert, func
+from app.database import engine, Base
+from app.models import ContentScan, Verification, ScanRollup, VerificationRollup, ContentSketch, HeavyHitterCheckpoint
+from app.rollups import GRANULARITIES, bucket_expression, bucket_start
+from app.content_sketches import content_sketches
+from app.hll import HyperLogLog
+from app.heavy_hitters import heavy_hitters
+
+CHUNK_ROWS = 1000
+
+def _as_datetime(bucket) -> datetime:
+    # sqlite buckets come back as text
+    return datetime.fromisoformat(bucket) if isinstance(bucket, str) else bucket
+
+async def _insert(conn, model, rows):
+    for start in range(0, len(rows), CHUNK_ROWS):
+        await conn.execute(insert(model.__table__), rows[start:start + CHUNK_ROWS])
+
+async def backfill_rollups():
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all, tables=[ScanRollup.__table__, VerificationRollup.__table__])
+        await conn.execute(delete(ScanRollup))
+        await conn.execute(delete(VerificationRollup))
+        dialect = conn.dialect.name
+
+        for granularity in GRANULARITIES:
+            bucket = bucket_expression(dialect, ContentScan.created_at, granularity)
+            platform = func.coalesce(ContentScan.source_platform, "unknown")
+            result = await conn.execute(
+                select(bucket, platform, ContentScan.classification, ContentScan.content_type, func.count(ContentScan.id))
+                .group_by(bucket, platform, ContentScan.classification, ContentScan.content_type)
+            )
+            rows = [
+                dict(granularity=granularity, bucket=_as_datetime(start), source_platform=source_platform,
+                     classification=classification, content_type=content_type, scan_count=count)
+                for start, source_platform, classification, content_type, count in result
+            ]
+            await _insert(conn, ScanRollup, rows)
+            print(f"✅ {len(rows)} {granularity} scan rollups")
+
+            bucket = bucket_expression(dialect, Verification.first_seen, granularity)
+            result = await conn.execute(
+                select(bucket, Verification.classification, func.count(Verification.id), func.sum(Verification.view_count))
+                .group_by(bucket, Verification.classification)
+            )
+            rows = [
+                dict(granularity=granularity, bucket=_as_datetime(start), classification=classification,
+                     verification_count=count, view_count=views or 0)
+                for start, classification, count, views in result
+            ]
+            await _insert(conn, VerificationRollup, rows)
+            print(f"✅ {len(rows)} {granularity} verification rollups")
+
+    await backfill_sketches()
+    await backfill_heavy_hitters()
+    print("\nRollups rebuilt - stats endpoints are ready 🎉")
+
+async def backfill_sketches():
+    """One sketch per hour, platform and classification, written as node 'backfill'"""
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all, tables=[ContentSketch.__table__])
+        await conn.execute(delete(ContentSketch))
+
+        # In time order, so only the current hour's sketches are held in memory
+        result = await conn.stream(
+            select(ContentScan.created_at, ContentScan.source_platform, ContentScan.classification, ContentScan.content_hash)
+            .order_by(ContentScan.created_at)
+            .execution_options(yield_per=10000)
+        )
+        # Compressed sketches are small; write them once the cursor is done
+        hour, sketches, rows = None, {}, []
+        async for partition in result.partitions():
+            for created_at, platform, classification, content_hash in partition:
+                bucket = bucket_start(created_at, "hour")
+                if bucket != hour:
+                    rows.extend(_sketch_rows(hour, sketches))
+                    hour, sketches = bucket, {}
+                sketches.setdefault((platform or "unknown", classification), []).append(content_hash)
+        rows.extend(_sketch_rows(hour, sketches))
+        await _insert(conn, ContentSketch, rows)
+
+    print(f"✅ {len(rows)} content sketches")
+
+def _sketch_rows(hour, sketches):
+    for (platform, classification), hashes in sketches.items():
+        sketch = HyperLogLog(content_sketches.precision)
+        sketch.add_many(hashes)
+        yield dict(node="backfill", bucket=hour, source_platform=platform,
+                   classification=classification, sketch=sketch.to_bytes(), updated_at=datetime.utcnow())
+
+async def backfill_heavy_hitters():
+    """Seed the top-verified tracker with the most viewed verifications"""
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all, tables=[HeavyHitterCheckpoint.__table__])
+        await conn.execute(delete(HeavyHitterCheckpoint))
+
+        total = (await conn.execute(select(func.sum(Verification.view_count)))).scalar() or 0
+        result = await conn.execute(
+            select(Verification.content_hash, Verification.view_count)
+            .order_by(Verification.view_count.desc())
+            .limit(heavy_hitters.capacity)
+        )
+        items = [[content_hash, view_count, 0] for content_hash, view_count in result]
+        await conn.execute(insert(HeavyHitterCheckpoint.__table__).values(
+            node="backfill",
+            data=json.dumps({"total": total, "items": items, "slices": []}),
+            updated_at=datetime.utcnow()
+        ))
+
+    print(f"✅ {len(items)} top verified seeded")
+
+if __name__ == "__main__":
+    asyncio.run(backfill_rollups())
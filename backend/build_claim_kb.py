@@ -0,0 +1,37 @@
+"""
+Build the known-claims knowledge base used for offline fact checking
+
+Input is JSON Lines, one known claim per line:
+  {"claim": "5G towers spread COVID-19", "verdict": "FALSE",
+   "confidence": 0.95, "explanation": "...", "sources": ["WHO"]}
+
+verdict is one of TRUE, FALSE, MISLEADING, UNVERIFIABLE, NEEDS_CONTEXT.
+
+Usage:
+  python build_claim_kb.py known_claims.jsonl claims.kb
+Then set CLAIM_KB_PATH=claims.kb
+"""
+import sys
+import json
+from app.detection.claim_kb import build_knowledge_base
+
+def read_records(path):
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+def main():
+    if len(sys.argv) != 3:
+        print(__doc__)
+        sys.exit(1)
+
+    source, target = sys.argv[1], sys.argv[2]
+    count = build_knowledge_base(read_records(source), target)
+
+    print(f"✅ Wrote {count} known claims to {target}")
+    print(f"   Set CLAIM_KB_PATH={target} to enable offline fact checking")
+
+if __name__ == "__main__":
+    main()
@@ -28,7 +28,9 @@ async def create_verifications_table():
     CREATE INDEX IF NOT EXISTS idx_verifications_content_hash ON verifications(content_hash);
     CREATE INDEX IF NOT EXISTS idx_verifications_first_seen ON verifications(first_seen);
     CREATE INDEX IF NOT EXISTS idx_verifications_classification ON verifications(classification);
-    CREATE INDEX IF NOT EXISTS idx_verifications_view_count ON verifications(view_count DESC);
+    -- Top verified content comes from app.heavy_hitters; an index on the
+    -- counter every view updates only slowed writes
+    DROP INDEX IF EXISTS idx_verifications_view_count;
     """
 
     async with engine.begin() as conn:
@@ -38,7 +40,6 @@ async def create_verifications_table():
     print("   - content_hash index created")
     print("   - first_seen index created")
     print("   - classification index created")
-    print("   - view_count index created")
     print("\nPoC Certified system is ready! 🎉")
 
 if __name__ == "__main__":
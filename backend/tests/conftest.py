@@ -0,0 +1,4 @@
+import os
+
+# app.config reads this at import; tests never need Postgres
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///:memory:")
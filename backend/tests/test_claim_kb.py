@@ -0,0 +1,25 @@
+from app.detection.claim_kb import build_knowledge_base, ClaimKnowledgeBase
+
+def make_kb(tmp_path, records):
+    path = str(tmp_path / "claims.kb")
+    build_knowledge_base(records, path)
+    return ClaimKnowledgeBase(path)
+
+def test_negated_query_does_not_match_plain_claim(tmp_path):
+    kb = make_kb(tmp_path, [{"claim": "vaccines cause autism", "verdict": "FALSE"}])
+
+    assert kb.lookup("vaccines cause autism")["verdict"] == "FALSE"
+    assert kb.lookup("vaccines don't cause autism") is None
+    assert kb.lookup("vaccines do not cause autism") is None
+    assert kb.lookup("vaccines never cause autism") is None
+
+def test_negated_query_matches_negated_claim(tmp_path):
+    kb = make_kb(tmp_path, [
+        {"claim": "vaccines cause autism", "verdict": "FALSE"},
+        {"claim": "vaccines do not cause autism", "verdict": "TRUE"},
+    ])
+
+    result = kb.lookup("vaccines don't cause autism")
+    assert result["verdict"] == "TRUE"
+    assert result["matched_claim"] == "vaccines do not cause autism"
+    assert kb.lookup("vaccines cause autism")["verdict"] == "FALSE"
@@ -0,0 +1,47 @@
+import io
+import base64
+import asyncio
+from PIL import Image
+from app.config import settings
+from app.detection.companion import ScreenCompanion
+
+def screenshot(color="white") -> str:
+    buffer = io.BytesIO()
+    Image.new("RGB", (800, 600), color).save(buffer, "PNG")
+    return base64.b64encode(buffer.getvalue()).decode()
+
+def make_companion():
+    companion = ScreenCompanion()
+    companion.anthropic_key = "test"
+
+    async def vision(data, context, media_type="image/jpeg"):
+        await asyncio.sleep(0.05)
+        return {"message": context, "tone": "curious", "confidence": 0.7}
+
+    companion._vision_analyze = vision
+    return companion
+
+def test_reuse_only_for_the_same_page(monkeypatch):
+    monkeypatch.setattr(settings, "COMPANION_MIN_INTERVAL", 60.0)
+    companion = make_companion()
+    shot = screenshot()
+
+    async def run():
+        first = asyncio.ensure_future(
+            companion.comment_on_screen(shot, url="https://a.example", page_title="A", session_id="s")
+        )
+        while "s" not in companion._sessions or companion._sessions["s"].in_flight is None:
+            await asyncio.sleep(0.001)
+        # Another page while the first is still in flight: not shared
+        second = await companion.comment_on_screen(shot, url="https://b.example", page_title="B", session_id="s")
+        shared = [await first, second]
+        again = await companion.comment_on_screen(shot, url="https://b.example", page_title="B", session_id="s")
+        other = await companion.comment_on_screen(shot, url="https://a.example", page_title="A", session_id="s")
+        return shared, again, other
+
+    (a, b), again, other = asyncio.run(run())
+    assert not a.reused and "a.example" in a.message
+    assert not b.reused and "b.example" in b.message
+    assert again.reused and "b.example" in again.message
+    assert not other.reused and "a.example" in other.message
+    assert companion.vision_calls == 3
@@ -0,0 +1,61 @@
+import asyncio
+import hashlib
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+from app import content_sketches as sketches_module
+from app.models import Classification
+from app.content_sketches import ContentSketches
+
+def scans(count, created_at=None):
+    return [
+        dict(content_hash=hashlib.sha256(str(i).encode()).hexdigest(), created_at=created_at or datetime.utcnow(),
+             source_platform="web", classification=Classification.AI)
+        for i in range(count)
+    ]
+
+class EmptyDb:
+    """Session with no stored sketch rows"""
+
+    async def stream_scalars(self, query):
+        async def rows():
+            return
+            yield
+        return rows()
+
+class SlowEngine:
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.executed = 0
+
+    @asynccontextmanager
+    async def begin(self):
+        yield self
+
+    async def execute(self, stmt):
+        await asyncio.sleep(self.delay)
+        self.executed += 1
+
+def test_unique_counts_unflushed_sketches():
+    sketches = ContentSketches(precision=10)
+    sketches.add(scans(6))
+    sketches.add(scans(3, created_at=datetime.utcnow() - timedelta(days=2)))
+
+    assert asyncio.run(sketches.unique(EmptyDb())) == 6
+    assert asyncio.run(sketches.unique(EmptyDb(), since=datetime.utcnow() - timedelta(hours=1))) == 6
+    assert asyncio.run(sketches.unique(EmptyDb(), since=datetime.utcnow())) == 6
+
+def test_stop_during_flush_keeps_dirty_sketches(monkeypatch):
+    engine = SlowEngine(delay=0.2)
+    monkeypatch.setattr(sketches_module, "engine", engine)
+    sketches = ContentSketches(precision=10, flush_interval=0.05)
+
+    async def run():
+        await sketches.start()
+        sketches.add(scans(3))
+        await asyncio.sleep(0.1)
+        await sketches.stop()
+
+    asyncio.run(run())
+    assert engine.executed == 1
+    assert sketches.flushes == 1
+    assert sketches.stats()["dirty"] == 0
@@ -0,0 +1,58 @@
+import asyncio
+import httpx
+from app.main import app
+from app.database import engine, init_db
+from app.scan_buffer import scan_buffer
+from app.detection.text import TextDetector
+
+TEXT = "Furthermore, it is important to leverage a comprehensive and robust approach here."
+OTHER = "honestly i think this is kinda great lol, gonna try it tomorrow"
+
+def post(monkeypatch, path, body):
+    """POST body to path with the provider stubbed; returns (response, provider calls, scans submitted)"""
+    calls = []
+
+    async def provider(self, text, interactive=True):
+        calls.append(text)
+        return {"ai_probability": None, "available": False}
+
+    monkeypatch.setattr(TextDetector, "_huggingface_detect", provider)
+
+    async def run():
+        await init_db()
+        submitted = scan_buffer.submitted
+        try:
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+                response = await client.post(path, json=body)
+            return response, scan_buffer.submitted - submitted
+        finally:
+            await engine.dispose()
+
+    response, scans = asyncio.run(run())
+    return response, calls, scans
+
+def test_batch_keeps_one_result_and_scan_per_item(monkeypatch):
+    items = [{"content": TEXT}, {"content": OTHER}, {"content": TEXT}]
+    response, calls, scans = post(monkeypatch, "/api/v1/detect/batch", {"items": items})
+
+    data = response.json()
+    assert len(calls) == 2
+    assert scans == 3
+    assert data["summary"]["total"] == 3
+    assert [r["content_preview"][:10] for r in data["results"]] == [TEXT[:10], OTHER[:10], TEXT[:10]]
+    assert len({r["verification_id"] for r in data["results"]}) == 3
+
+def test_tweets_keep_repeated_tweets_in_input_order(monkeypatch):
+    tweets = [
+        {"text": TEXT, "username": "a", "tweet_id": "1"},
+        {"text": "hi"},
+        {"text": OTHER, "username": "b", "tweet_id": "2"},
+        {"text": TEXT, "username": "a", "tweet_id": "1"},
+    ]
+    response, calls, scans = post(monkeypatch, "/api/v1/detect/tweets", {"tweets": tweets})
+
+    data = response.json()
+    assert len(calls) == 2
+    assert scans == 3
+    assert data["summary"]["total"] == 3
+    assert [r["tweet_id"] for r in data["results"]] == ["1", "2", "1"]
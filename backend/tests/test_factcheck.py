@@ -0,0 +1,48 @@
+import asyncio
+
+from app.detection.factcheck import FactChecker
+
+class MemoryCache:
+    def __init__(self):
+        self.entries = {}
+
+    async def get(self, claim):
+        return self.entries.get(claim)
+
+    async def put(self, claim, result):
+        self.entries[claim] = result
+
+def make_checker(reply, delay=0.0):
+    checker = FactChecker()
+    checker.anthropic_key = "test"
+    checker.knowledge_base = None
+    checker.cache = MemoryCache()
+    calls = []
+
+    async def request(prompt, max_tokens):
+        calls.append(prompt)
+        await asyncio.sleep(delay)
+        return reply(prompt)
+
+    checker._anthropic_request = request
+    return checker, calls
+
+def test_deadline_with_partial_batch_reply_releases_flights():
+    partial = "CLAIM: 1\nVERDICT: TRUE\nCONFIDENCE: 0.9\nEXPLANATION: ok\nSOURCES: data"
+    checker, calls = make_checker(lambda prompt: partial, delay=0.3)
+
+    async def scenario():
+        results = await checker.check_claims(["alpha is 50%", "beta is 60%"], time_budget=0.1)
+        assert all(r.deadline_exceeded for r in results)
+
+        # Let the abandoned batch finish in the background
+        await asyncio.sleep(0.4)
+        assert checker.in_flight.stats()['in_flight'] == 0
+
+        # The unparsed claim is checked again rather than joining a dead flight
+        return await checker.check_claims(["beta is 60%"], time_budget=1.0)
+
+    results = asyncio.run(scenario())
+    assert len(calls) == 2
+    assert results[0].source == "llm"
+    assert not results[0].deadline_exceeded
@@ -0,0 +1,45 @@
+import json
+import asyncio
+from contextlib import asynccontextmanager
+from app import heavy_hitters as heavy_hitters_module
+from app.heavy_hitters import HeavyHitters
+
+class ClaimResult:
+    def __init__(self, data):
+        self.data = data
+
+    def scalars(self):
+        return self
+
+    def all(self):
+        return self.data
+
+class SlowClaimEngine:
+    """Hands out one abandoned checkpoint, committing slowly"""
+
+    def __init__(self, abandoned, delay: float):
+        self.abandoned = abandoned
+        self.delay = delay
+
+    @asynccontextmanager
+    async def begin(self):
+        yield self
+        await asyncio.sleep(self.delay)
+
+    async def execute(self, stmt):
+        claimed, self.abandoned = self.abandoned, []
+        return ClaimResult(claimed)
+
+def test_stop_during_checkpoint_keeps_claimed_summaries(monkeypatch):
+    abandoned = json.dumps({"total": 7, "items": [["abc", 7, 0]], "slices": []})
+    monkeypatch.setattr(heavy_hitters_module, "engine", SlowClaimEngine([abandoned], delay=0.2))
+    hitters = HeavyHitters(checkpoint_interval=60)
+
+    async def run():
+        await hitters.start()
+        await asyncio.sleep(0.05)
+        await hitters.stop()
+
+    asyncio.run(run())
+    assert hitters.claimed == 1
+    assert hitters.all_time.top(1) == [("abc", 7, 0)]
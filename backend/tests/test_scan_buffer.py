@@ -0,0 +1,54 @@
+import asyncio
+from contextlib import asynccontextmanager
+from app import scan_buffer as scan_buffer_module
+from app.scan_buffer import ScanWriteBuffer
+
+class FlakyEngine:
+    """Fails the first `failures` transactions; rows reach it through the rollup increment"""
+
+    def __init__(self, failures: int):
+        self.failures = failures
+        self.rows = []
+
+    @asynccontextmanager
+    async def begin(self):
+        if self.failures > 0:
+            self.failures -= 1
+            raise ConnectionError("database unavailable")
+        yield self
+
+    async def execute(self, stmt):
+        pass
+
+async def no_rollups(conn, rows):
+    conn.rows.extend(rows)
+
+def run_buffer(monkeypatch, failures, retries):
+    engine = FlakyEngine(failures)
+    monkeypatch.setattr(scan_buffer_module, "engine", engine)
+    monkeypatch.setattr(scan_buffer_module, "increment_scan_rollups", no_rollups)
+    monkeypatch.setattr(scan_buffer_module.content_sketches, "add", lambda rows: None)
+    monkeypatch.setattr(scan_buffer_module.live_stats, "publish_scans", lambda rows: None)
+    buffer = ScanWriteBuffer(flush_interval=0.01, retries=retries)
+
+    async def run():
+        await buffer.start()
+        await buffer.submit_many([{"content_hash": str(i)} for i in range(3)])
+        await buffer.stop()
+
+    asyncio.run(run())
+    return buffer, engine
+
+def test_failed_flush_is_retried(monkeypatch):
+    buffer, engine = run_buffer(monkeypatch, failures=2, retries=3)
+    assert buffer.written == 3
+    assert len(engine.rows) == 3
+    assert buffer.errors == 2
+    assert buffer.dropped == 0
+
+def test_rows_dropped_after_retries(monkeypatch):
+    buffer, engine = run_buffer(monkeypatch, failures=10, retries=2)
+    assert buffer.written == 0
+    assert engine.rows == []
+    assert buffer.errors == 3
+    assert buffer.dropped == 3
@@ -0,0 +1,35 @@
+import asyncio
+import httpx
+from app.main import app
+from app.database import engine, init_db
+from app.scan_buffer import scan_buffer
+from app.detection.text import TextDetector
+
+TEXT = "Furthermore, it is important to leverage a comprehensive and robust approach here."
+
+def test_detect_and_verify_share_one_provider_call(monkeypatch):
+    calls = []
+
+    async def provider(self, text, interactive=True):
+        calls.append(text)
+        await asyncio.sleep(0.1)
+        return {"ai_probability": None, "available": False}
+
+    monkeypatch.setattr(TextDetector, "_huggingface_detect", provider)
+
+    async def run():
+        await init_db()
+        await scan_buffer.start()
+        try:
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+                return await asyncio.gather(
+                    client.post("/api/v1/detect", json={"content": TEXT, "source_platform": "twitter"}),
+                    client.post("/api/v1/verify", json={"content": TEXT, "platform": "twitter"}),
+                )
+        finally:
+            await scan_buffer.stop()
+            await engine.dispose()
+
+    detected, verified = asyncio.run(run())
+    assert detected.status_code == 200 and verified.status_code == 200
+    assert len(calls) == 1
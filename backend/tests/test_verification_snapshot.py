@@ -0,0 +1,25 @@
+import hashlib
+import numpy as np
+from app.verification_snapshot import _RECORD, encode_snapshot, apply_delta, VerifiedHashSnapshot
+
+def make_records(digests):
+    records = np.zeros(len(digests), dtype=_RECORD)
+    records["hash"] = digests
+    records["classification"] = 1
+    records["confidence"] = 255
+    return records
+
+def test_lookup_matches_digest_ending_in_nul(tmp_path):
+    nul = bytes(range(1, 32)) + b"\x00"
+    digests = [hashlib.sha256(b"a").digest(), nul, hashlib.sha256(b"b").digest()]
+    base = encode_snapshot(make_records(digests[:1]), version=1)
+    delta = encode_snapshot(make_records(digests[1:]), version=2, since=1)
+
+    path = tmp_path / "snapshot.bin"
+    path.write_bytes(apply_delta(base, delta))
+    snapshot = VerifiedHashSnapshot(str(path))
+
+    assert len(snapshot) == 3
+    for digest in digests:
+        assert snapshot.lookup(digest.hex())["confidence"] == 1.0
+    assert snapshot.lookup((bytes(range(1, 32)) + b"\x01").hex()) is None
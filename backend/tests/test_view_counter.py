@@ -0,0 +1,40 @@
+import asyncio
+from contextlib import asynccontextmanager
+from app import view_counter
+from app.models import Classification
+from app.view_counter import ViewCountCoalescer
+
+class SlowEngine:
+    """Records executed parameters after a delay, so a flush can be caught mid-way"""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.executed = []
+
+    @asynccontextmanager
+    async def begin(self):
+        yield self
+
+    async def execute(self, stmt, params=None):
+        await asyncio.sleep(self.delay)
+        self.executed.extend(params or [])
+
+async def no_rollups(conn, rows):
+    pass
+
+def test_stop_during_flush_keeps_views(monkeypatch):
+    engine = SlowEngine(delay=0.2)
+    monkeypatch.setattr(view_counter, "engine", engine)
+    monkeypatch.setattr(view_counter, "increment_verification_rollups", no_rollups)
+    counter = ViewCountCoalescer(flush_interval=0.05)
+
+    async def run():
+        await counter.start()
+        for _ in range(3):
+            counter.record("abc", Classification.HUMAN)
+        await asyncio.sleep(0.1)
+        await counter.stop()
+
+    asyncio.run(run())
+    assert sum(params["views"] for params in engine.executed) == 3
+    assert counter.flushed == 3
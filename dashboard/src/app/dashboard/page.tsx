@@ -5,21 +5,89 @@ import { PieChart, Pie, Cell, ResponsiveContainer, BarChart, Bar, XAxis, YAxis,
 import { Activity, Bot, User, Globe, Twitter, AlertTriangle } from 'lucide-react'
 import { api, type DashboardStats } from '@/lib/api'
 
+type PlatformCounts = { total: number; ai_count: number; ai_percentage?: number }
+
+// /stats also carries the raw counts the live deltas add to
+type LiveStats = DashboardStats & {
+  classification_counts: Record<string, number>
+  platform_stats: Record<string, PlatformCounts>
+}
+
+type ScanDelta = {
+  scans: number
+  by_classification: Record<string, number>
+  platforms: Record<string, PlatformCounts>
+  recent_scans: DashboardStats['recent_scans']
+}
+
+const EMPTY_PLATFORM = { total: 0, ai_count: 0, ai_percentage: 0 }
+
+function percentage(count: number, total: number) {
+  return total > 0 ? Math.round((count / total) * 1000) / 10 : 0
+}
+
+// Fold a live delta into the last snapshot
+function applyDelta(stats: LiveStats, delta: ScanDelta): LiveStats {
+  const total = stats.total_scans + delta.scans
+  const counts: Record<string, number> = { ...stats.classification_counts }
+  for (const [classification, count] of Object.entries(delta.by_classification)) {
+    counts[classification] = (counts[classification] || 0) + count
+  }
+
+  const platforms: Record<string, PlatformCounts> = { ...stats.platform_stats }
+  for (const [platform, change] of Object.entries(delta.platforms)) {
+    const current = platforms[platform] || EMPTY_PLATFORM
+    const merged = { total: current.total + change.total, ai_count: current.ai_count + change.ai_count }
+    platforms[platform] = { ...merged, ai_percentage: percentage(merged.ai_count, merged.total) }
+  }
+
+  return {
+    ...stats,
+    total_scans: total,
+    classification_counts: counts,
+    ai_percentage: percentage(counts.ai || 0, total),
+    human_percentage: percentage(counts.human || 0, total),
+    mixed_percentage: percentage(counts.mixed || 0, total),
+    bot_percentage: percentage(counts.bot || 0, total),
+    platform_stats: platforms,
+    twitter_stats: platforms.twitter || EMPTY_PLATFORM,
+    reddit_stats: platforms.reddit || EMPTY_PLATFORM,
+    web_stats: platforms.web || EMPTY_PLATFORM,
+    recent_scans: [...delta.recent_scans, ...stats.recent_scans].slice(0, 10),
+  }
+}
+
 export default function Dashboard() {
-  const [stats, setStats] = useState<DashboardStats | null>(null)
+  const [stats, setStats] = useState<LiveStats | null>(null)
   const [loading, setLoading] = useState(true)
   const [error, setError] = useState<string | null>(null)
 
   useEffect(() => {
-    fetchStats()
-    const interval = setInterval(fetchStats, 10000) // Refresh every 10s
-    return () => clearInterval(interval)
+    // Live stats: a snapshot, then deltas as scans are written.
+    // EventSource reconnects by itself, resuming from the last event id.
+    const source = new EventSource('/api/v1/stats/stream')
+    source.addEventListener('snapshot', (event) => {
+      setStats(JSON.parse((event as MessageEvent).data))
+      setError(null)
+      setLoading(false)
+    })
+    source.addEventListener('scans', (event) => {
+      const delta: ScanDelta = JSON.parse((event as MessageEvent).data)
+      setStats((current) => (current ? applyDelta(current, delta) : current))
+    })
+    source.onerror = () => {
+      if (source.readyState === EventSource.CLOSED) {
+        setError('Failed to load stats. Is the API running?')
+        setLoading(false)
+      }
+    }
+    return () => source.close()
   }, [])
 
   async function fetchStats() {
     try {
       const data = await api.getStats()
-      setStats(data)
+      setStats(data as LiveStats)
       setError(null)
     } catch (e) {
       setError('Failed to load stats. Is the API running?')
@@ -14,6 +14,8 @@ class Companion {
     this.comments = [];
     this.isVisible = false;
     this.currentContext = {};
+    // Lets the backend skip repeat comments while this tab's screen is unchanged
+    this.sessionId = crypto.randomUUID();
   }
 
   init() {
@@ -356,12 +358,16 @@ class Companion {
         body: JSON.stringify({
           url,
           page_title: title,
-          page_text: pageText
+          page_text: pageText,
+          session_id: this.sessionId
         })
       });
 
       if (response.ok) {
         const data = await response.json();
+        if (data.reused) {
+          return;
+        }
         this.addComment(data);
 
         // Auto-show sidebar when first comment arrives
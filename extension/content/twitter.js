@@ -3,7 +3,9 @@
 
   const CONFIG = {
     DEFAULT_API_URL: 'http://localhost:8000/api/v1',
-    SCAN_INTERVAL: 2000
+    SCAN_INTERVAL: 2000,
+    CHECK_BATCH_SIZE: 500,
+    VERIFY_BATCH_SIZE: 100
   };
 
   let API_URL = CONFIG.DEFAULT_API_URL;
@@ -71,85 +73,109 @@
     return tweets;
   }
 
-  // Check if content is already verified (network effect!)
-  async function checkVerification(contentHash) {
+  // Check which hashes are already verified (network effect!), in one request per batch
+  async function checkVerifications(contentHashes) {
+    const verifications = new Map();
+    const unknown = [];
+
     // Check local cache first
-    if (verificationCache.has(contentHash)) {
-      return verificationCache.get(contentHash);
+    for (const contentHash of contentHashes) {
+      if (verificationCache.has(contentHash)) {
+        verifications.set(contentHash, verificationCache.get(contentHash));
+      } else {
+        unknown.push(contentHash);
+      }
     }
 
-    try {
-      const res = await fetch(`${API_URL}/check/${contentHash}`, {
-        method: 'GET'
-      });
-
-      if (res.ok) {
-        const data = await res.json();
-        verificationCache.set(contentHash, data);
-        return data;
+    for (let i = 0; i < unknown.length; i += CONFIG.CHECK_BATCH_SIZE) {
+      try {
+        const res = await fetch(`${API_URL}/check/batch`, {
+          method: 'POST',
+          headers: { 'Content-Type': 'application/json' },
+          body: JSON.stringify({
+            content_hashes: unknown.slice(i, i + CONFIG.CHECK_BATCH_SIZE)
+          })
+        });
+
+        if (res.ok) {
+          const data = await res.json();
+          for (const [contentHash, verification] of Object.entries(data.found)) {
+            verificationCache.set(contentHash, verification);
+            verifications.set(contentHash, verification);
+          }
+        }
+      } catch (e) {
+        // Treat as not verified yet
       }
-      return null; // Not verified yet
-    } catch (e) {
-      return null;
     }
+
+    return verifications;
   }
 
-  // Verify content (first time or cache miss)
-  async function verifyContent(tweet) {
-    try {
-      const res = await fetch(`${API_URL}/verify`, {
-        method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({
-          content: tweet.text,
-          platform: 'twitter',
-          post_id: tweet.tweet_id,
-          post_url: tweet.post_url
-        })
-      });
-
-      if (res.ok) {
-        const data = await res.json();
-        verificationCache.set(data.content_hash, data);
-        return data;
+  // Verify content (first time or cache miss), all in one request per batch
+  // Returns one verification (or undefined) per tweet, in order; results are
+  // matched by position, since the server's hash normalization may differ from hashText
+  async function verifyContents(tweets, hashes) {
+    const verifications = new Array(tweets.length);
+
+    for (let i = 0; i < tweets.length; i += CONFIG.VERIFY_BATCH_SIZE) {
+      try {
+        const res = await fetch(`${API_URL}/verify/batch`, {
+          method: 'POST',
+          headers: { 'Content-Type': 'application/json' },
+          body: JSON.stringify({
+            posts: tweets.slice(i, i + CONFIG.VERIFY_BATCH_SIZE).map(tweet => ({
+              content: tweet.text,
+              platform: 'twitter',
+              post_id: tweet.tweet_id,
+              post_url: tweet.post_url
+            }))
+          })
+        });
+
+        if (res.ok) {
+          const data = await res.json();
+          data.results.forEach((verification, j) => {
+            if (!verification) return;
+            verificationCache.set(hashes[i + j], verification);
+            verifications[i + j] = verification;
+          });
+        }
+      } catch (e) {
+        console.error('PoC verification error:', e);
       }
-      return null;
-    } catch (e) {
-      console.error('PoC verification error:', e);
-      return null;
     }
+
+    return verifications;
   }
 
-  async function detectTweet(tweet) {
-    try {
-      // Step 1: Hash the content
-      const contentHash = await hashText(tweet.text);
+  async function detectTweets(tweets) {
+    if (tweets.length === 0) return;
+
+    // Step 1: Hash the content
+    const hashes = await Promise.all(tweets.map(tweet => hashText(tweet.text)));
 
-      // Step 2: Check if already verified (fast path!)
-      let verification = await checkVerification(contentHash);
+    // Step 2: Check which are already verified (fast path!)
+    const verifications = await checkVerifications([...new Set(hashes)]);
 
+    // Step 3: Show cached results, verify the rest in one go
+    const unverified = [];
+    tweets.forEach((tweet, i) => {
+      const verification = verifications.get(hashes[i]);
       if (verification) {
         // Cached! Show immediately
         applyVerifiedBadge(tweet, verification, true);
-        return;
+      } else {
+        unverified.push(i);
       }
+    });
 
-      // Step 3: Not cached, verify now
-      verification = await verifyContent(tweet);
-
-      if (verification) {
-        applyVerifiedBadge(tweet, verification, false);
+    const verified = await verifyContents(unverified.map(i => tweets[i]), unverified.map(i => hashes[i]));
+    unverified.forEach((i, j) => {
+      if (verified[j]) {
+        applyVerifiedBadge(tweets[i], verified[j], false);
       }
-    } catch (e) {
-      console.error('PoC tweet detection error:', e);
-    }
-  }
-
-  async function detectTweets(tweets) {
-    if (tweets.length === 0) return;
-
-    // Process all tweets in parallel
-    await Promise.all(tweets.map(tweet => detectTweet(tweet)));
+    });
 
     // Update floating badge with stats
     window.pocHighlighter?.updateBadge({